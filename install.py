@@ -6,24 +6,53 @@ Handles dependency installation automatically.
 import subprocess
 import sys
 import os
+from importlib import metadata
 from pathlib import Path
 
+def is_requirement_satisfied(requirement):
+    """Check whether a requirement is already installed without spawning pip."""
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        # Without packaging we can only check that the distribution is present
+        name = requirement.split(">=")[0].split("==")[0].strip()
+        try:
+            metadata.version(name)
+            return True
+        except metadata.PackageNotFoundError:
+            return False
+
+    req = Requirement(requirement)
+    try:
+        version = metadata.version(req.name)
+    except metadata.PackageNotFoundError:
+        return False
+    return req.specifier.contains(version, prereleases=True)
+
 def install_dependencies():
     """Install required Python packages."""
     requirements = [
         "click>=8.0.0",
-        "sqlalchemy>=2.0.0",
+        "sqlalchemy>=2.0.10",
         "pydantic>=2.0.0",
         "rich>=13.0.0",
         "python-dotenv>=1.0.0",
         "pyyaml>=6.0"
     ]
+    # Optional speedups, not installed automatically:
+    #   orjson - faster JSON parsing for `prompt-bookmarks import-prompts`
+    #   ijson  - streams large import files instead of loading them whole
+    # Install with: pip install "prompt-bookmarks[fast]"
+
+    missing = [req for req in requirements if not is_requirement_satisfied(req)]
+    if not missing:
+        print("✅ All dependencies already installed.")
+        return True
 
     print("Installing Prompt Bookmarks dependencies...")
     try:
-        for req in requirements:
-            print(f"Installing {req}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", req])
+        # One pip invocation resolves all requirements in a single pass
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
         print("✅ All dependencies installed successfully!")
         return True
     except subprocess.CalledProcessError as e:
@@ -42,7 +71,8 @@ def setup_database():
 
         # Setup database
         db_path = Path.home() / ".prompt_bookmarks" / "prompts.db"
-        db_path.parent.mkdir(exist_ok=True)
+        if not db_path.parent.is_dir():
+            db_path.parent.mkdir(parents=True, exist_ok=True)
 
         if not db_path.exists():
             print("Setting up database...")
@@ -5,7 +5,6 @@ This script ensures the package is properly set up and runs the server.
 """
 import sys
 import os
-import asyncio
 from pathlib import Path
 
 def main():
@@ -20,20 +19,19 @@ def main():
     try:
         # Try to import and run the server
         from prompt_bookmarks.mcp_server import MCPStdioServer
-        from prompt_bookmarks.database import Database
+        from prompt_bookmarks.database import get_database
 
-        # Initialize database if needed
         db_path = Path.home() / ".prompt_bookmarks" / "prompts.db"
-        db_path.parent.mkdir(exist_ok=True)
+        if not db_path.parent.is_dir():
+            db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if not db_path.exists():
-            # Initialize the database
-            db = Database(str(db_path))
-            db.init_db()
+        # Database skips initialization itself when the schema is current,
+        # so a single instance is shared with the server
+        db = get_database(str(db_path))
 
         # Run the MCP server
-        server = MCPStdioServer(str(db_path))
-        asyncio.run(server.run())
+        server = MCPStdioServer(db=db)
+        server.run_blocking()
 
     except ImportError as e:
         print(f"Error importing prompt_bookmarks: {e}", file=sys.stderr)
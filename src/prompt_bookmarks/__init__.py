@@ -12,8 +12,32 @@ __version__ = "0.1.0"
 __author__ = "Nika Tamaio Flores"
 __email__ = "tamayoflores.n@gmail.com"
 
-from .models import Prompt, Folder, Tag
-from .database import Database
-from .mcp_server import MCPStdioServer
+import importlib
 
-__all__ = ["Prompt", "Folder", "Tag", "Database", "MCPStdioServer"]
+# Exported name -> submodule defining it; imported on first access so that
+# `import prompt_bookmarks.cli` doesn't pull in SQLAlchemy and pydantic
+_EXPORTS = {
+    "Prompt": ".models",
+    "Folder": ".models",
+    "Tag": ".models",
+    "Database": ".database",
+    "get_database": ".database",
+    "MCPStdioServer": ".mcp_server",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import a package export from its submodule on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    """List the lazy exports alongside the loaded attributes."""
+    return sorted(list(globals()) + __all__)
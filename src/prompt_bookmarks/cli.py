@@ -7,53 +7,109 @@ Provides commands for managing prompts, folders, and tags.
 import os
 import sys
 import json
-import subprocess
+import pickle
+import hashlib
 from pathlib import Path
 from typing import List, Optional
 import click
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from rich.panel import Panel
-from rich.syntax import Syntax
 
-from .database import Database
-from .models import PromptCreate, PromptUpdate, PromptSearch
-from .mcp_server import MCPStdioServer
+from . import __version__
 
 
-console = Console()
+_console_instance = None
+
+_SEP = "─" * 50
+
+# Parsed imports kept in ~/.prompt_bookmarks/import_cache; least recently used go first
+IMPORT_CACHE_LIMIT = 16
+
+# Bump when the pickled import cache entries change shape
+_IMPORT_CACHE_FORMAT = 2
+
+
+def _console():
+    """Get the shared Rich console, importing Rich on first use."""
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+        _console_instance = Console()
+    return _console_instance
+
+
+_SHEBANG_LANGUAGES = {
+    "python": "python",
+    "python3": "python",
+    "bash": "bash",
+    "sh": "bash",
+    "zsh": "bash",
+    "node": "javascript",
+}
+
+
+def _detect_language(content: str) -> Optional[str]:
+    """Guess a highlighting language from a shebang or opening code fence."""
+    first_line = content.split('\n', 1)[0].strip()
+    
+    if first_line.startswith("#!"):
+        interpreter = first_line.rsplit("/", 1)[-1].split()
+        if interpreter and interpreter[0] == "env" and len(interpreter) > 1:
+            interpreter = interpreter[1:]
+        return _SHEBANG_LANGUAGES.get(interpreter[0]) if interpreter else None
+    
+    if first_line.startswith("```"):
+        return first_line[3:].strip() or None
+    
+    return None
 
 
 def get_default_db_path() -> str:
     """Get default database path."""
     data_dir = Path.home() / ".prompt_bookmarks"
-    data_dir.mkdir(exist_ok=True)
+    if not data_dir.is_dir():
+        data_dir.mkdir(parents=True, exist_ok=True)
     return str(data_dir / "prompts.db")
 
 
 @click.group()
-@click.option('--db-path', '-d', help='Database path', default=get_default_db_path())
+@click.option('--db-path', '-d', help='Database path [default: ~/.prompt_bookmarks/prompts.db]')
 @click.pass_context
-def cli(ctx, db_path: str):
+def cli(ctx, db_path: Optional[str]):
     """Prompt Bookmarks - Organize and access your prompts across AI tools."""
     ctx.ensure_object(dict)
-    ctx.obj['db_path'] = db_path
-    ctx.obj['db'] = Database(db_path)
+    
+    # Resolve the default path, which creates the data directory, only when a command needs it
+    def get_db_path():
+        return db_path or get_default_db_path()
+    
+    # Open the database only when a command actually needs it
+    def get_db():
+        from .database import get_database
+        return get_database(get_db_path())
+    
+    ctx.obj['get_db_path'] = get_db_path
+    ctx.obj['get_db'] = get_db
 
 
 @cli.command()
 @click.pass_context
 def init(ctx):
     """Initialize the prompt database."""
-    db_path = ctx.obj['db_path']
+    from .database import Database
+    
+    console = _console()
+    db_path = ctx.obj['get_db_path']()
     
     if os.path.exists(db_path):
         if not click.confirm(f"Database already exists at {db_path}. Reinitialize?"):
             return
+        
+        # Start from an empty file, including any SQLite journal files
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm", f"{db_path}-journal"):
+            if os.path.exists(path):
+                os.remove(path)
     
     # Initialize database (this happens automatically in Database.__init__)
-    db = Database(db_path)
+    Database(db_path)
     
     console.print(f"Initialized prompt database at: {db_path}", style="green")
     console.print("\nDefault folders and tags have been created.")
@@ -72,7 +128,10 @@ def init(ctx):
 @click.pass_context
 def add(ctx, title: str, content: str, description: Optional[str], folder: Optional[str], tags: List[str]):
     """Add a new prompt."""
-    db = ctx.obj['db']
+    from .models import PromptCreate
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         prompt_data = PromptCreate(
@@ -87,8 +146,8 @@ def add(ctx, title: str, content: str, description: Optional[str], folder: Optio
         
         console.print(f"Created prompt: {prompt.title}", style="green")
         console.print(f"Folder: {prompt.folder_path or 'Root'}")
-        if prompt.tags:
-            console.print(f"Tags: {', '.join([tag.name for tag in prompt.tags])}")
+        if prompt.tags_csv:
+            console.print(f"Tags: {prompt.tags_csv}")
         console.print(f"ID: {prompt.id}")
         
     except Exception as e:
@@ -103,7 +162,11 @@ def add(ctx, title: str, content: str, description: Optional[str], folder: Optio
 @click.pass_context
 def list_prompts(ctx, folder: Optional[str], tag: List[str], limit: int, verbose: bool):
     """List prompts with optional filtering."""
-    db = ctx.obj['db']
+    from rich.table import Table
+    from .models import PromptSearch
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         search_params = PromptSearch(
@@ -112,14 +175,15 @@ def list_prompts(ctx, folder: Optional[str], tag: List[str], limit: int, verbose
             limit=limit
         )
         
-        prompts, total = db.search_prompts(search_params)
+        # Flat rows carry pre-aggregated tags and a SQL-side content preview
+        rows, total = db.search_prompts_flat(search_params, preview_length=100 if verbose else 0)
         
-        if not prompts:
+        if not rows:
             console.print("No prompts found.", style="yellow")
             return
         
         # Create table
-        table = Table(title=f"Prompts ({len(prompts)}/{total})")
+        table = Table(title=f"Prompts ({len(rows)}/{total})")
         table.add_column("ID", style="cyan", no_wrap=True)
         table.add_column("Title", style="white", no_wrap=True)
         table.add_column("Folder", style="blue")
@@ -128,19 +192,16 @@ def list_prompts(ctx, folder: Optional[str], tag: List[str], limit: int, verbose
         if verbose:
             table.add_column("Content", style="dim")
         
-        for prompt in prompts:
-            folder_display = prompt.folder_path or "/"
-            tags_display = ", ".join([tag.name for tag in prompt.tags]) if prompt.tags else ""
-            
+        for prompt in rows:
             row = [
                 str(prompt.id),
                 prompt.title,
-                folder_display,
-                tags_display
+                prompt.folder_path or "/",
+                prompt.tags_csv or ""
             ]
             
             if verbose:
-                content_preview = prompt.content[:100] + "..." if len(prompt.content) > 100 else prompt.content
+                content_preview = prompt.content_preview + "..." if prompt.content_length > 100 else prompt.content_preview
                 row.append(content_preview)
             
             table.add_row(*row)
@@ -154,22 +215,29 @@ def list_prompts(ctx, folder: Optional[str], tag: List[str], limit: int, verbose
 @cli.command()
 @click.argument('query')
 @click.option('--folder', '-f', help='Filter by folder path')
+@click.option('--recursive', '-r', is_flag=True, help='Include prompts in subfolders of --folder')
 @click.option('--tag', '-t', multiple=True, help='Filter by tags')
 @click.option('--limit', '-l', default=10, help='Maximum number of results')
 @click.pass_context
-def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
-    """Search prompts by content."""
-    db = ctx.obj['db']
+def search(ctx, query: str, folder: Optional[str], recursive: bool, tag: List[str], limit: int):
+    """Search prompts by content (matches words starting with each term)."""
+    from rich.console import Group
+    from rich.panel import Panel
+    from .models import PromptSearch
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         search_params = PromptSearch(
             query=query,
-            folder_path=folder,
+            folder_path=None if recursive else folder,
+            folder_path_prefix=folder if recursive else None,
             tags=list(tag) if tag else None,
             limit=limit
         )
         
-        prompts, total = db.search_prompts(search_params)
+        prompts, total = db.search_prompts_with_tags_csv(search_params)
         
         if not prompts:
             console.print(f"No prompts found matching '{query}'", style="yellow")
@@ -177,6 +245,8 @@ def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
         
         console.print(f"Found {len(prompts)}/{total} prompts matching '{query}':")
         
+        # Collect everything and render once instead of printing per result
+        renderables = []
         for prompt in prompts:
             panel_content = []
             
@@ -184,8 +254,8 @@ def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
                 panel_content.append(f"[dim]{prompt.description}[/dim]")
                 panel_content.append("")
             
-            # Show content preview
-            content_lines = prompt.content.split('\n')
+            # Show content preview; only split as far as the lines we display
+            content_lines = prompt.content.split('\n', 3)
             if len(content_lines) > 3:
                 content_preview = '\n'.join(content_lines[:3]) + "\n[dim]...[/dim]"
             else:
@@ -198,8 +268,8 @@ def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
             metadata = []
             if prompt.folder_path:
                 metadata.append(f"Folder: {prompt.folder_path}")
-            if prompt.tags:
-                metadata.append(f"Tags: {', '.join([tag.name for tag in prompt.tags])}")
+            if prompt.tags_csv:
+                metadata.append(f"Tags: {prompt.tags_csv}")
             metadata.append(f"ID: {prompt.id}")
             
             panel_content.append(" • ".join(metadata))
@@ -209,8 +279,10 @@ def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
                 title=f"[bold]{prompt.title}[/bold]",
                 border_style="blue"
             )
-            console.print(panel)
-            console.print()
+            renderables.append(panel)
+            renderables.append("")
+        
+        console.print(Group(*renderables))
         
     except Exception as e:
         console.print(f" Error searching prompts: {e}", style="red")
@@ -221,7 +293,11 @@ def search(ctx, query: str, folder: Optional[str], tag: List[str], limit: int):
 @click.pass_context
 def show(ctx, prompt_id: int):
     """Show full prompt details."""
-    db = ctx.obj['db']
+    from rich.console import Group
+    from rich.text import Text
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         prompt = db.get_prompt(prompt_id)
@@ -240,18 +316,22 @@ def show(ctx, prompt_id: int):
         metadata = []
         if prompt.folder_path:
             metadata.append(f" Folder: {prompt.folder_path}")
-        if prompt.tags:
-            metadata.append(f"  Tags: {', '.join([tag.name for tag in prompt.tags])}")
+        if prompt.tags_csv:
+            metadata.append(f"  Tags: {prompt.tags_csv}")
         metadata.append(f" ID: {prompt.id}")
         metadata.append(f"📅 Created: {prompt.created_at.strftime('%Y-%m-%d %H:%M') if prompt.created_at else 'Unknown'}")
         
         console.print("\n" + " • ".join(metadata))
         
-        # Content
-        console.print("\n" + "─" * 50)
-        syntax = Syntax(prompt.content, "text", theme="monokai", line_numbers=False)
-        console.print(syntax)
-        console.print("─" * 50)
+        # Content; plain prompts skip Pygments, only recognizable code is highlighted
+        language = _detect_language(prompt.content)
+        if language:
+            from rich.syntax import Syntax
+            body = Syntax(prompt.content, language, theme="monokai", line_numbers=False)
+        else:
+            body = Text(prompt.content)
+        
+        console.print(Group(Text("\n" + _SEP), body, Text(_SEP)))
         
     except Exception as e:
         console.print(f" Error showing prompt: {e}", style="red")
@@ -268,7 +348,10 @@ def show(ctx, prompt_id: int):
 def edit(ctx, prompt_id: int, title: Optional[str], content: Optional[str], 
          description: Optional[str], folder: Optional[str], tags: Optional[str]):
     """Edit an existing prompt."""
-    db = ctx.obj['db']
+    from .models import PromptUpdate
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         # Check if prompt exists
@@ -304,27 +387,36 @@ def edit(ctx, prompt_id: int, title: Optional[str], content: Optional[str],
 
 
 @cli.command()
-@click.argument('prompt_id', type=int)
-@click.confirmation_option(prompt='Are you sure you want to delete this prompt?')
+@click.argument('prompt_ids', type=int, nargs=-1, required=True)
+@click.option('--yes', '-y', is_flag=True, help='Delete without asking for confirmation')
 @click.pass_context
-def delete(ctx, prompt_id: int):
-    """Delete a prompt."""
-    db = ctx.obj['db']
+def delete(ctx, prompt_ids: List[int], yes: bool):
+    """Delete one or more prompts."""
+    if not yes:
+        noun = "this prompt" if len(prompt_ids) == 1 else f"these {len(prompt_ids)} prompts"
+        if not click.confirm(f"Are you sure you want to delete {noun}?"):
+            return
+    
+    console = _console()
+    db = ctx.obj['get_db']()
+    
+    if len(prompt_ids) > 1:
+        try:
+            deleted = db.delete_prompts_bulk(prompt_ids)
+            console.print(f" Deleted {deleted} of {len(prompt_ids)} prompts", style="green")
+        except Exception as e:
+            console.print(f" Error deleting prompts: {e}", style="red")
+        return
     
+    prompt_id = prompt_ids[0]
     try:
-        # Check if prompt exists
-        existing = db.get_prompt(prompt_id)
-        if not existing:
-            console.print(f" Prompt {prompt_id} not found", style="red")
-            return
-        
-        # Delete prompt
-        success = db.delete_prompt(prompt_id)
+        # Delete prompt; None means it didn't exist
+        title = db.delete_prompt(prompt_id)
         
-        if success:
-            console.print(f" Deleted prompt: {existing.title}", style="green")
+        if title is not None:
+            console.print(f" Deleted prompt: {title}", style="green")
         else:
-            console.print(f" Failed to delete prompt {prompt_id}", style="red")
+            console.print(f" Prompt {prompt_id} not found", style="red")
         
     except Exception as e:
         console.print(f" Error deleting prompt: {e}", style="red")
@@ -335,7 +427,8 @@ def delete(ctx, prompt_id: int):
 @click.pass_context
 def tags(ctx, category: Optional[str]):
     """List all tags."""
-    db = ctx.obj['db']
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         tags = db.list_tags(category)
@@ -367,7 +460,10 @@ def tags(ctx, category: Optional[str]):
 @click.pass_context
 def folders(ctx, parent: Optional[str]):
     """List folders."""
-    db = ctx.obj['db']
+    from rich.table import Table
+    
+    console = _console()
+    db = ctx.obj['get_db']()
     
     try:
         folders = db.list_folders(parent)
@@ -394,13 +490,11 @@ def folders(ctx, parent: Optional[str]):
 @click.pass_context
 def serve(ctx):
     """Start MCP server for Claude Desktop integration."""
-    import asyncio
-    
-    db_path = ctx.obj['db_path']
+    from .mcp_server import MCPStdioServer
     
     # Create and run stdio MCP server
-    server = MCPStdioServer(db_path)
-    asyncio.run(server.run())
+    server = MCPStdioServer(db=ctx.obj['get_db']())
+    server.run_blocking()
 
 
 @cli.command()
@@ -409,28 +503,86 @@ def serve(ctx):
 @click.pass_context
 def import_prompts(ctx, file: str, folder: Optional[str]):
     """Import prompts from JSON file."""
-    db = ctx.obj['db']
+    from .models import PromptCreate
     
-    try:
-        with open(file, 'r') as f:
-            data = json.load(f)
-        
-        imported = 0
-        for item in data:
+    console = _console()
+    db = ctx.obj['get_db']()
+    
+    skipped = []
+    
+    def iter_prompt_data(items):
+        # Validate each item up front so one bad entry doesn't abort the batch
+        for item in items:
             try:
-                prompt_data = PromptCreate(
+                yield PromptCreate(
                     title=item['title'],
                     content=item['content'],
                     description=item.get('description'),
                     folder_path=folder or item.get('folder_path'),
                     tags=item.get('tags', [])
                 )
-                
-                db.create_prompt(prompt_data)
-                imported += 1
-                
             except Exception as e:
-                console.print(f"  Skipped invalid prompt: {e}", style="yellow")
+                skipped.append(f"Skipped invalid prompt: {e}")
+    
+    def parse_file():
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        
+        if ijson is not None:
+            # Parse items incrementally so the raw document is never held in memory;
+            # the validated prompts are still collected for the cache
+            with open(file, 'rb') as f:
+                return list(iter_prompt_data(ijson.items(f, 'item')))
+        
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        
+        if orjson is not None:
+            with open(file, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file, 'r') as f:
+                data = json.load(f)
+        return list(iter_prompt_data(data))
+    
+    try:
+        # Parsed prompts are cached by file content, target folder and package version
+        digest = hashlib.sha256(f"{__version__}:{_IMPORT_CACHE_FORMAT}:{folder or ''}:".encode())
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        
+        cache_dir = Path.home() / ".prompt_bookmarks" / "import_cache"
+        cache_file = cache_dir / f"{digest.hexdigest()}.pkl"
+        
+        prompts = None
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    prompts, skipped = pickle.load(f)
+                os.utime(cache_file)  # Mark as recently used
+            except Exception:
+                prompts = None  # Stale or unreadable cache, parse again
+                skipped = []
+        
+        if prompts is None:
+            prompts = parse_file()
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                with open(cache_file, 'wb') as f:
+                    pickle.dump((prompts, skipped), f, protocol=pickle.HIGHEST_PROTOCOL)
+                _prune_import_cache(cache_dir)
+            except OSError:
+                pass  # Caching is best effort
+        
+        for message in skipped:
+            console.print(f"  {message}", style="yellow")
+        
+        imported = len(db.create_prompts_bulk(prompts))
         
         console.print(f" Imported {imported} prompts from {file}", style="green")
         
@@ -438,6 +590,16 @@ def import_prompts(ctx, file: str, folder: Optional[str]):
         console.print(f" Error importing prompts: {e}", style="red")
 
 
+def _prune_import_cache(cache_dir: Path):
+    """Delete all but the IMPORT_CACHE_LIMIT most recently used import cache entries."""
+    entries = sorted(cache_dir.glob("*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[IMPORT_CACHE_LIMIT:]:
+        try:
+            stale.unlink()
+        except FileNotFoundError:
+            pass  # Removed by a concurrent import
+
+
 def main():
     """Main CLI entry point."""
     cli()
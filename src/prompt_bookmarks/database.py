@@ -5,18 +5,98 @@ Handles all database operations including CRUD for prompts, folders, and tags.
 """
 
 import os
-from typing import List, Optional, Tuple
+import re
+import sys
+import threading
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
-from sqlalchemy import create_engine, and_, or_
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import create_engine, event, and_, or_, func, text, bindparam, delete, insert, select, update, literal, literal_column
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, Session, configure_mappers, selectinload, joinedload, load_only
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 from .models import (
-    Base, PromptDB, FolderDB, TagDB, 
-    Prompt, Folder, Tag, PromptCreate, PromptUpdate, PromptSearch
+    Base, PromptDB, FolderDB, TagDB, prompt_tags,
+    Prompt, Folder, Tag, PromptCreate, PromptUpdate, PromptSearch, validate_hex_color
 )
 
 
+# Bump when init_db() needs to run again on existing databases
+SCHEMA_VERSION = 5
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# Full-text index over prompt text, kept in sync with the prompts table by triggers
+FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+        title, content, description, content='prompts', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS prompts_fts_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO prompts_fts(rowid, title, content, description)
+        VALUES (new.id, new.title, new.content, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS prompts_fts_ad AFTER DELETE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, title, content, description)
+        VALUES ('delete', old.id, old.title, old.content, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS prompts_fts_au AFTER UPDATE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, title, content, description)
+        VALUES ('delete', old.id, old.title, old.content, old.description);
+        INSERT INTO prompts_fts(rowid, title, content, description)
+        VALUES (new.id, new.title, new.content, new.description);
+    END""",
+    "INSERT INTO prompts_fts(prompts_fts) VALUES ('rebuild')",
+)
+
+# Search terms shorter than this use a substring scan instead of the full-text index
+FTS_MIN_TERM_LENGTH = 3
+# Terms without a word character (e.g. "...", "---") produce no FTS5 tokens
+_FTS_TOKEN_RE = re.compile(r"\w")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune a freshly opened SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+    
+    # Let _begin_transaction() emit BEGIN instead of the driver's implicit one
+    dbapi_connection.isolation_level = None
+
+
+def _begin_transaction(conn):
+    """Start a transaction, taking the write lock up front when the session asked for it."""
+    conn.exec_driver_sql(conn.get_execution_options().get("sqlite_begin", "BEGIN"))
+
+
+def _intern_path(path: Optional[str]) -> Optional[str]:
+    """Share one string object per folder path across the rows and requests that carry it."""
+    return sys.intern(path) if path is not None else None
+
+
+# One Database per resolved path, shared by get_database() callers
+_SINGLETONS: Dict[str, "Database"] = {}
+_SINGLETONS_LOCK = threading.Lock()
+
+
+def _clear_session_caches(session, previous_transaction):
+    """Drop cached folders and tags once a rollback may have discarded them."""
+    session.info["folder_by_path"].clear()
+    session.info["tag_by_name"].clear()
+
+
 class Database:
     """Database management class."""
     
@@ -25,28 +105,67 @@ class Database:
         if db_path is None:
             # Default to user's data directory
             data_dir = Path.home() / ".prompt_bookmarks"
-            data_dir.mkdir(exist_ok=True)
+            if not data_dir.is_dir():
+                data_dir.mkdir(parents=True, exist_ok=True)
             db_path = str(data_dir / "prompts.db")
         
         self.db_path = db_path
-        self.engine = create_engine(f"sqlite:///{db_path}")
+        self.engine = create_engine(
+            f"sqlite:///{db_path}",
+            pool_size=5,
+            max_overflow=10,
+            connect_args={"check_same_thread": False},
+            query_cache_size=1200,
+        )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        event.listen(self.engine, "begin", _begin_transaction)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        event.listen(self.SessionLocal, "after_soft_rollback", _clear_session_caches)
         
-        # Create tables
+        self.init_db_if_needed()
+        self.has_fts = self._fts_table_exists()
+    
+    def init_db(self):
+        """Create tables and default data. Safe to call repeatedly."""
         Base.metadata.create_all(bind=self.engine)
         
-        # Initialize default data
+        # create_all skips existing tables, so add indexes introduced later explicitly
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
         self._initialize_defaults()
+        self._initialize_fts()
+        
+        with self.engine.begin() as conn:
+            conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    
+    def init_db_if_needed(self):
+        """Run init_db() unless the database is already at the current schema version."""
+        with self.engine.connect() as conn:
+            version = conn.execute(text("PRAGMA user_version")).scalar()
+        
+        if version != SCHEMA_VERSION:
+            self.init_db()
     
     def _initialize_defaults(self):
         """Initialize default folders and tags."""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             # Create root folder if it doesn't exist
-            root = session.query(FolderDB).filter_by(path="/").first()
-            if not root:
-                root = FolderDB(name="Root", path="/", parent_id=None)
-                session.add(root)
-                session.commit()
+            session.execute(
+                sqlite_insert(FolderDB)
+                .values(name="Root", path="/", parent_id=None)
+                .on_conflict_do_nothing(index_elements=["path"])
+            )
+            
+            # Top-level folders have a NULL parent; undo rows parented to Root by older versions
+            root_id = select(FolderDB.id).where(FolderDB.path == "/").scalar_subquery()
+            session.execute(
+                update(FolderDB)
+                .where(FolderDB.parent_id == root_id)
+                .values(parent_id=None)
+                .execution_options(synchronize_session=False)
+            )
             
             # Create default AI tool tags
             default_tags = [
@@ -59,25 +178,63 @@ class Database:
                 ("analysis", "topic", "#06B6D4"),
             ]
             
-            for tag_name, category, color in default_tags:
-                existing_tag = session.query(TagDB).filter_by(name=tag_name).first()
-                if not existing_tag:
-                    tag = TagDB(name=tag_name, category=category, color=color)
-                    session.add(tag)
+            session.execute(
+                sqlite_insert(TagDB)
+                .values([
+                    {"name": name, "category": category, "color": color}
+                    for name, category, color in default_tags
+                ])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
             
             session.commit()
     
+    def _initialize_fts(self):
+        """Create and populate the full-text index when SQLite has FTS5."""
+        try:
+            with self.engine.begin() as conn:
+                for statement in FTS_SCHEMA:
+                    conn.execute(text(statement))
+        except OperationalError:
+            pass  # SQLite built without FTS5; searches fall back to ilike
+    
+    def _fts_table_exists(self) -> bool:
+        """Check whether the full-text index is present."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompts_fts'")
+            ).first() is not None
+    
     def get_session(self) -> Session:
-        """Get database session."""
-        return self.SessionLocal()
+        """Get database session with empty folder-by-path and tag-by-name caches."""
+        return self.SessionLocal(info={"folder_by_path": {}, "tag_by_name": {}})
+    
+    def get_write_session(self) -> Session:
+        """Get a session whose transaction starts with BEGIN IMMEDIATE.
+        
+        Taking the write lock when the transaction opens avoids a failed
+        read-to-write lock upgrade when another connection writes concurrently.
+        """
+        session = self.get_session()
+        session.connection(execution_options={"sqlite_begin": "BEGIN IMMEDIATE"})
+        return session
+    
+    def warmup(self):
+        """Configure mappers and run the hot statements once so their compiled forms are cached."""
+        configure_mappers()
+        with self.get_session() as session:
+            session.query(PromptDB.id).limit(1).all()
+            self._filtered_prompt_query(session, PromptSearch(query="", tags=[])).limit(1).all()
+            self._get_folder_db(session, "/")
+            self._get_tag_db(session, "")
     
     # Folder operations
     def create_folder(self, name: str, path: str, parent_path: Optional[str] = None) -> Folder:
         """Create a new folder."""
-        with self.get_session() as session:
+        with self.get_write_session() as session:
             parent_id = None
             if parent_path:
-                parent = session.query(FolderDB).filter_by(path=parent_path).first()
+                parent = self._get_folder_db(session, parent_path)
                 if parent:
                     parent_id = parent.id
             
@@ -88,57 +245,131 @@ class Database:
             
             return Folder.model_validate(folder_db)
     
+    def ensure_folder(self, path: str) -> None:
+        """Create the folder for a path and any missing ancestors, if they don't exist yet."""
+        with self.get_write_session() as session:
+            self._insert_folder_chain(session, path)
+            session.commit()
+    
     def get_folder_by_path(self, path: str) -> Optional[Folder]:
         """Get folder by path."""
         with self.get_session() as session:
-            folder_db = session.query(FolderDB).filter_by(path=path).first()
+            folder_db = self._get_folder_db(session, path)
             if folder_db:
-                return Folder.model_validate(folder_db)
+                return self._folder_db_to_pydantic(folder_db)
             return None
     
+    def folder_prompt_count(self, path: str) -> Optional[int]:
+        """Count the prompts directly in a folder, or return None if the folder doesn't exist."""
+        with self.get_session() as session:
+            row = session.execute(
+                select(FolderDB.id, func.count(PromptDB.id))
+                .outerjoin(PromptDB, PromptDB.folder_id == FolderDB.id)
+                .where(FolderDB.path == path)
+                .group_by(FolderDB.id)
+            ).first()
+            return row[1] if row else None
+    
     def list_folders(self, parent_path: Optional[str] = None) -> List[Folder]:
         """List folders, optionally filtered by parent."""
         with self.get_session() as session:
             query = session.query(FolderDB)
             
             if parent_path is not None:
-                parent = session.query(FolderDB).filter_by(path=parent_path).first()
+                parent = self._get_folder_db(session, parent_path)
                 if parent:
                     query = query.filter_by(parent_id=parent.id)
                 else:
                     return []
             
             folders_db = query.all()
-            folders = []
             
-            for folder_db in folders_db:
-                folder = Folder.model_validate(folder_db)
-                # Count prompts in this folder
-                folder.prompt_count = session.query(PromptDB).filter_by(folder_id=folder_db.id).count()
-                folders.append(folder)
+            # Count prompts for every folder in one grouped query
+            counts = dict(
+                session.query(PromptDB.folder_id, func.count(PromptDB.id))
+                .group_by(PromptDB.folder_id)
+                .all()
+            )
             
-            return folders
+            return [
+                self._folder_db_to_pydantic(folder_db, counts.get(folder_db.id, 0))
+                for folder_db in folders_db
+            ]
     
     def delete_folder(self, path: str) -> bool:
         """Delete a folder and optionally move prompts to parent."""
-        with self.get_session() as session:
-            folder = session.query(FolderDB).filter_by(path=path).first()
+        with self.get_write_session() as session:
+            folder = self._get_folder_db(session, path)
             if not folder:
                 return False
             
-            # Move prompts to parent folder
+            # Move prompts to parent folder in one statement, bypassing the unit of work
             parent_id = folder.parent_id
-            session.query(PromptDB).filter_by(folder_id=folder.id).update({"folder_id": parent_id})
+            session.execute(
+                update(PromptDB)
+                .where(PromptDB.folder_id == folder.id)
+                .values(folder_id=parent_id)
+                .execution_options(synchronize_session=False)
+            )
             
             # Delete folder
+            session.info["folder_by_path"].pop(path, None)
             session.delete(folder)
             session.commit()
             return True
     
+    def rename_folder_subtree(self, old_path: str, new_path: str) -> Optional[Tuple[int, int]]:
+        """Move a folder and everything below it to a new path.
+        
+        Returns (folders renamed, prompts in them), or None if the folder doesn't
+        exist. Raises ValueError if new_path is already taken or lies inside old_path.
+        """
+        if old_path == "/":
+            raise ValueError("Cannot rename the root folder")
+        if new_path.startswith(old_path + "/"):
+            raise ValueError("Cannot move folder to be a child of itself")
+        
+        with self.get_write_session() as session:
+            folder = self._get_folder_db(session, old_path)
+            if not folder:
+                return None
+            if self._get_folder_db(session, new_path):
+                raise ValueError(f"Folder '{new_path}' already exists")
+            
+            # Top-level folders have no parent, as in _insert_folder_chain
+            parent_path = new_path.rsplit('/', 1)[0]
+            parent_id = None
+            if parent_path:
+                self._insert_folder_chain(session, parent_path)
+                parent_id = self._get_folder_db(session, parent_path).id
+            
+            in_subtree = self._subtree_filter(old_path)
+            subtree_ids = select(FolderDB.id).where(in_subtree).scalar_subquery()
+            prompt_count = session.scalar(
+                select(func.count(PromptDB.id)).where(PromptDB.folder_id.in_(subtree_ids))
+            )
+            
+            # Prompts reference folders by id, so rewriting the paths moves them too
+            result = session.execute(
+                update(FolderDB)
+                .where(in_subtree)
+                .values(path=literal(new_path).concat(func.substr(FolderDB.path, len(old_path) + 1)))
+                .execution_options(synchronize_session=False)
+            )
+            session.execute(
+                update(FolderDB)
+                .where(FolderDB.id == folder.id)
+                .values(name=new_path.rsplit('/', 1)[1], parent_id=parent_id)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return result.rowcount, prompt_count
+    
     # Tag operations
     def create_tag(self, name: str, category: Optional[str] = None, color: Optional[str] = None) -> Tag:
         """Create a new tag."""
-        with self.get_session() as session:
+        validate_hex_color(color)  # Before the insert, so a bad color never reaches the table
+        with self.get_write_session() as session:
             tag_db = TagDB(name=name, category=category, color=color)
             session.add(tag_db)
             session.commit()
@@ -149,9 +380,9 @@ class Database:
     def get_tag_by_name(self, name: str) -> Optional[Tag]:
         """Get tag by name."""
         with self.get_session() as session:
-            tag_db = session.query(TagDB).filter_by(name=name).first()
+            tag_db = self._get_tag_db(session, name)
             if tag_db:
-                return Tag.model_validate(tag_db)
+                return self._tag_db_to_pydantic(tag_db)
             return None
     
     def list_tags(self, category: Optional[str] = None) -> List[Tag]:
@@ -162,15 +393,43 @@ class Database:
                 query = query.filter_by(category=category)
             
             tags_db = query.all()
-            return [Tag.model_validate(tag_db) for tag_db in tags_db]
+            return [self._tag_db_to_pydantic(tag_db) for tag_db in tags_db]
+    
+    def update_tag(self, current_name: str, new_name: Optional[str] = None,
+                   category: Optional[str] = None, color: Optional[str] = None) -> Optional[Tag]:
+        """Update a tag in place, keeping its prompt associations; None leaves a field unchanged."""
+        validate_hex_color(color)
+        values = {
+            column: value
+            for column, value in (("name", new_name), ("category", category), ("color", color))
+            if value is not None
+        }
+        if not values:
+            return self.get_tag_by_name(current_name)
+        
+        with self.get_write_session() as session:
+            try:
+                tag_db = session.scalars(
+                    update(TagDB).where(TagDB.name == current_name).values(**values).returning(TagDB)
+                ).first()
+            except IntegrityError:
+                session.rollback()
+                raise ValueError(f"Tag '{new_name}' already exists")
+            if tag_db is None:
+                return None
+            
+            tag = Tag.model_validate(tag_db)
+            session.commit()
+            return tag
     
     def delete_tag(self, name: str) -> bool:
         """Delete a tag."""
-        with self.get_session() as session:
-            tag = session.query(TagDB).filter_by(name=name).first()
+        with self.get_write_session() as session:
+            tag = self._get_tag_db(session, name)
             if not tag:
                 return False
             
+            session.info["tag_by_name"].pop(name, None)
             session.delete(tag)
             session.commit()
             return True
@@ -178,52 +437,40 @@ class Database:
     # Prompt operations
     def create_prompt(self, prompt_data: PromptCreate) -> Prompt:
         """Create a new prompt."""
-        with self.get_session() as session:
-            # Get or create folder
-            folder_id = None
-            if prompt_data.folder_path:
-                folder = session.query(FolderDB).filter_by(path=prompt_data.folder_path).first()
-                if not folder:
-                    # Create folder hierarchy
-                    folder = self._create_folder_hierarchy(session, prompt_data.folder_path)
-                folder_id = folder.id
-            
-            # Create prompt
-            prompt_db = PromptDB(
-                title=prompt_data.title,
-                content=prompt_data.content,
-                description=prompt_data.description,
-                folder_id=folder_id
-            )
-            session.add(prompt_db)
-            session.flush()  # Get the ID
-            
-            # Add tags
-            for tag_name in prompt_data.tags:
-                tag = session.query(TagDB).filter_by(name=tag_name).first()
-                if not tag:
-                    tag = TagDB(name=tag_name, category="custom")
-                    session.add(tag)
-                    session.flush()
-                prompt_db.tags.append(tag)
+        with self.get_write_session() as session:
+            prompt_db = self._add_prompt(session, prompt_data)
             
             session.commit()
             session.refresh(prompt_db)
             
             return self._prompt_db_to_pydantic(session, prompt_db)
     
+    def create_prompts_bulk(self, prompts: Iterable[PromptCreate], chunk_size: int = 500) -> List[int]:
+        """Create many prompts in a single transaction. Returns the new IDs in input order."""
+        prompts = iter(prompts)
+        prompt_ids = []
+        with self.get_write_session() as session:
+            while True:
+                chunk = list(islice(prompts, chunk_size))
+                if not chunk:
+                    break
+                prompt_ids.extend(self._insert_prompt_chunk(session, chunk))
+            
+            session.commit()
+            return prompt_ids
+    
     def get_prompt(self, prompt_id: int) -> Optional[Prompt]:
         """Get prompt by ID."""
         with self.get_session() as session:
-            prompt_db = session.query(PromptDB).filter_by(id=prompt_id).first()
+            prompt_db = session.get(PromptDB, prompt_id, options=self._prompt_load_options())
             if prompt_db:
                 return self._prompt_db_to_pydantic(session, prompt_db)
             return None
     
     def update_prompt(self, prompt_id: int, prompt_data: PromptUpdate) -> Optional[Prompt]:
         """Update a prompt."""
-        with self.get_session() as session:
-            prompt_db = session.query(PromptDB).filter_by(id=prompt_id).first()
+        with self.get_write_session() as session:
+            prompt_db = session.get(PromptDB, prompt_id, options=self._prompt_load_options())
             if not prompt_db:
                 return None
             
@@ -237,77 +484,163 @@ class Database:
             
             # Update folder
             if prompt_data.folder_path is not None:
-                folder = session.query(FolderDB).filter_by(path=prompt_data.folder_path).first()
-                if not folder and prompt_data.folder_path:
+                folder = None
+                if prompt_data.folder_path:
                     folder = self._create_folder_hierarchy(session, prompt_data.folder_path)
                 prompt_db.folder_id = folder.id if folder else None
             
             # Update tags
             if prompt_data.tags is not None:
-                prompt_db.tags.clear()
-                for tag_name in prompt_data.tags:
-                    tag = session.query(TagDB).filter_by(name=tag_name).first()
-                    if not tag:
-                        tag = TagDB(name=tag_name, category="custom")
-                        session.add(tag)
-                        session.flush()
-                    prompt_db.tags.append(tag)
+                prompt_db.tags = self._get_or_create_tags(session, prompt_data.tags)
             
             session.commit()
             session.refresh(prompt_db)
             
             return self._prompt_db_to_pydantic(session, prompt_db)
     
-    def delete_prompt(self, prompt_id: int) -> bool:
-        """Delete a prompt."""
-        with self.get_session() as session:
-            prompt = session.query(PromptDB).filter_by(id=prompt_id).first()
-            if not prompt:
-                return False
-            
-            session.delete(prompt)
+    def delete_prompt(self, prompt_id: int) -> Optional[str]:
+        """Delete a prompt. Returns its title, or None if it didn't exist."""
+        with self.get_write_session() as session:
+            session.execute(delete(prompt_tags).where(prompt_tags.c.prompt_id == prompt_id))
+            title = session.execute(
+                delete(PromptDB).where(PromptDB.id == prompt_id).returning(PromptDB.title)
+            ).scalar()
             session.commit()
-            return True
+            return title
+    
+    def delete_prompts_bulk(self, prompt_ids: Iterable[int]) -> int:
+        """Delete several prompts in one transaction. Returns the number deleted."""
+        prompt_ids = list(prompt_ids)
+        with self.get_write_session() as session:
+            session.execute(delete(prompt_tags).where(prompt_tags.c.prompt_id.in_(prompt_ids)))
+            result = session.execute(delete(PromptDB).where(PromptDB.id.in_(prompt_ids)))
+            session.commit()
+            return result.rowcount
     
     def search_prompts(self, search_params: PromptSearch) -> Tuple[List[Prompt], int]:
         """Search prompts with filtering and pagination."""
         with self.get_session() as session:
-            query = session.query(PromptDB)
+            query = self._filtered_prompt_query(session, search_params)
+            if query is None:
+                return [], 0
+            
+            # Fetch the page and the total match count together with a window function;
+            # eager-load relationships so a page costs a fixed number of queries
+            rows = (
+                query.add_columns(func.count().over().label("total"))
+                .options(*self._prompt_list_load_options())
+                .offset(search_params.offset)
+                .limit(search_params.limit)
+                .all()
+            )
             
-            # Text search
-            if search_params.query:
-                search_term = f"%{search_params.query}%"
-                query = query.filter(
-                    or_(
-                        PromptDB.title.ilike(search_term),
-                        PromptDB.content.ilike(search_term),
-                        PromptDB.description.ilike(search_term)
-                    )
+            if rows:
+                total = rows[0].total
+            elif search_params.offset:
+                total = query.count()  # Paged past the end, the window saw no rows
+            else:
+                total = 0
+            
+            prompts = [self._prompt_db_to_pydantic_fast(prompt_db) for prompt_db, _ in rows]
+            
+            return prompts, total
+    
+    def iter_prompt_summaries(self, limit: int = 1000, preview_length: int = 100, chunk_size: int = 200) -> Iterator[Tuple]:
+        """Yield ``(id, title, description, content_preview)`` rows in ID order without building ORM objects."""
+        with self.get_session() as session:
+            query = (
+                session.query(
+                    PromptDB.id,
+                    PromptDB.title,
+                    PromptDB.description,
+                    func.substr(PromptDB.content, 1, preview_length).label("content_preview"),
                 )
+                .order_by(PromptDB.id)
+                .limit(limit)
+                .yield_per(chunk_size)
+            )
+            yield from query
+    
+    def search_prompts_flat(self, search_params: PromptSearch, preview_length: int = 0) -> Tuple[List[Tuple], int]:
+        """Search prompts returning display rows instead of full models.
+        
+        Each row has ``id``, ``title``, ``folder_path`` and ``tags_csv``, plus
+        ``content_preview`` and ``content_length`` when ``preview_length`` is set.
+        Tags are aggregated in SQL so a page costs a single query.
+        """
+        with self.get_session() as session:
+            query = self._filtered_prompt_query(session, search_params)
+            if query is None:
+                return [], 0
             
-            # Folder filter
-            if search_params.folder_path:
-                folder = session.query(FolderDB).filter_by(path=search_params.folder_path).first()
-                if folder:
-                    query = query.filter_by(folder_id=folder.id)
-                else:
-                    return [], 0
+            total = query.count()
+            page_ids = self._page_ids(session, query, search_params)
             
-            # Tag filter
-            if search_params.tags:
-                for tag_name in search_params.tags:
-                    tag = session.query(TagDB).filter_by(name=tag_name).first()
-                    if tag:
-                        query = query.filter(PromptDB.tags.contains(tag))
+            columns = [
+                PromptDB.id,
+                PromptDB.title,
+                FolderDB.path.label("folder_path"),
+                func.group_concat(TagDB.name, ", ").label("tags_csv"),
+            ]
+            if preview_length:
+                columns.append(func.substr(PromptDB.content, 1, preview_length).label("content_preview"))
+                columns.append(func.length(PromptDB.content).label("content_length"))
+            
+            rows = (
+                session.query(*columns)
+                .outerjoin(FolderDB, PromptDB.folder_id == FolderDB.id)
+                .outerjoin(prompt_tags, prompt_tags.c.prompt_id == PromptDB.id)
+                .outerjoin(TagDB, TagDB.id == prompt_tags.c.tag_id)
+                .filter(PromptDB.id.in_(page_ids))
+                .group_by(PromptDB.id)
+                .order_by(PromptDB.id)
+                .all()
+            )
+            
+            return rows, total
+    
+    def search_prompts_with_tags_csv(self, search_params: PromptSearch) -> Tuple[List[Prompt], int]:
+        """Search prompts with ``tags_csv`` aggregated in SQL instead of loading tag objects.
+        
+        The returned prompts have an empty ``tags`` list; use ``tags_csv`` for display.
+        """
+        with self.get_session() as session:
+            query = self._filtered_prompt_query(session, search_params)
+            if query is None:
+                return [], 0
             
-            # Get total count
             total = query.count()
+            page_ids = self._page_ids(session, query, search_params)
             
-            # Apply pagination
-            query = query.offset(search_params.offset).limit(search_params.limit)
+            rows = (
+                session.query(
+                    PromptDB,
+                    FolderDB.path,
+                    func.group_concat(TagDB.name, ", "),
+                )
+                .outerjoin(FolderDB, PromptDB.folder_id == FolderDB.id)
+                .outerjoin(prompt_tags, prompt_tags.c.prompt_id == PromptDB.id)
+                .outerjoin(TagDB, TagDB.id == prompt_tags.c.tag_id)
+                .filter(PromptDB.id.in_(page_ids))
+                .group_by(PromptDB.id)
+                .order_by(PromptDB.id)
+                .all()
+            )
             
-            prompts_db = query.all()
-            prompts = [self._prompt_db_to_pydantic(session, p) for p in prompts_db]
+            prompts = [
+                Prompt(
+                    id=prompt_db.id,
+                    title=prompt_db.title,
+                    content=prompt_db.content,
+                    description=prompt_db.description,
+                    folder_id=prompt_db.folder_id,
+                    folder_path=_intern_path(folder_path),
+                    created_at=prompt_db.created_at,
+                    updated_at=prompt_db.updated_at,
+                    tags_csv=tags_csv
+                )
+                for prompt_db, folder_path, tags_csv in rows
+            ]
             
             return prompts, total
     
@@ -317,34 +650,321 @@ class Database:
         return self.search_prompts(search_params)
     
     # Helper methods
+    def _get_folder_db(self, session: Session, path: str) -> Optional[FolderDB]:
+        """Look up a folder by path, consulting the session cache first."""
+        cache = session.info["folder_by_path"]
+        folder = cache.get(path)
+        if folder is None:
+            folder = session.scalars(select(FolderDB).where(FolderDB.path == path).limit(1)).first()
+            if folder is not None:
+                cache[path] = folder
+        return folder
+    
+    def _get_tag_db(self, session: Session, name: str) -> Optional[TagDB]:
+        """Look up a tag by name, consulting the session cache first."""
+        cache = session.info["tag_by_name"]
+        tag = cache.get(name)
+        if tag is None:
+            tag = session.scalars(select(TagDB).where(TagDB.name == name).limit(1)).first()
+            if tag is not None:
+                cache[name] = tag
+        return tag
+    
+    def _filtered_prompt_query(self, session: Session, search_params: PromptSearch):
+        """Build the prompt query for search filters, or None if nothing can match."""
+        query = session.query(PromptDB)
+        
+        # Text search
+        if search_params.query:
+            fts_query = self._fts_query(search_params.query)
+            if fts_query:
+                matches = (
+                    select(literal_column("rowid"))
+                    .select_from(text("prompts_fts"))
+                    .where(text("prompts_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+                )
+                query = query.filter(PromptDB.id.in_(matches))
+            else:
+                search_term = f"%{search_params.query}%"
+                query = query.filter(
+                    or_(
+                        PromptDB.title.ilike(search_term),
+                        PromptDB.content.ilike(search_term),
+                        PromptDB.description.ilike(search_term)
+                    )
+                )
+        
+        # Folder filter
+        if search_params.folder_path:
+            folder = self._get_folder_db(session, search_params.folder_path)
+            if folder:
+                query = query.filter_by(folder_id=folder.id)
+            else:
+                return None
+        
+        # Subtree filter: prompts in a folder or in any folder below it
+        if search_params.folder_path_prefix:
+            subtree_ids = select(FolderDB.id).where(self._subtree_filter(search_params.folder_path_prefix))
+            query = query.filter(PromptDB.folder_id.in_(subtree_ids))
+        
+        # Tag filter: prompts that carry every requested tag, resolved in one grouped subquery
+        if search_params.tags:
+            tag_names = set(search_params.tags)
+            tagged_ids = (
+                select(prompt_tags.c.prompt_id)
+                .join(TagDB, TagDB.id == prompt_tags.c.tag_id)
+                .where(TagDB.name.in_(tag_names))
+                .group_by(prompt_tags.c.prompt_id)
+                .having(func.count(func.distinct(prompt_tags.c.tag_id)) == len(tag_names))
+            )
+            query = query.filter(PromptDB.id.in_(tagged_ids))
+        
+        return query
+    
+    def _fts_query(self, query: str) -> Optional[str]:
+        """Turn a search string into an FTS5 prefix query, or None to use ilike.
+        
+        Indexed searches match words that start with each term ("cod" finds
+        "code", "ode" does not); short or punctuation-only terms use ilike.
+        """
+        terms = query.split()
+        if not self.has_fts or not terms:
+            return None
+        if any(len(term) < FTS_MIN_TERM_LENGTH or not _FTS_TOKEN_RE.search(term) for term in terms):
+            return None
+        # Quote each term so user input can't be parsed as FTS5 operators
+        return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+    
+    def _prompt_load_options(self):
+        """Loader options for reading prompts with their folder and tags."""
+        return (selectinload(PromptDB.tags), joinedload(PromptDB.folder))
+    
+    def _prompt_list_load_options(self):
+        """Loader options for result pages, limited to the columns Prompt exposes."""
+        return (
+            load_only(
+                PromptDB.id, PromptDB.title, PromptDB.content, PromptDB.description,
+                PromptDB.folder_id, PromptDB.created_at, PromptDB.updated_at
+            ),
+            selectinload(PromptDB.tags).load_only(TagDB.id, TagDB.name, TagDB.category, TagDB.color),
+            joinedload(PromptDB.folder).load_only(FolderDB.path),
+        )
+    
+    def _page_ids(self, session: Session, query, search_params: PromptSearch):
+        """Select the prompt IDs on the requested page of a filtered query."""
+        page = (
+            query.with_entities(PromptDB.id)
+            .order_by(PromptDB.id)
+            .offset(search_params.offset)
+            .limit(search_params.limit)
+            .subquery()
+        )
+        return session.query(page.c.id)
+    
+    def _add_prompt(self, session: Session, prompt_data: PromptCreate) -> PromptDB:
+        """Add a prompt with its folder and tags to the session without committing."""
+        # Get or create folder; the hierarchy helper returns existing folders as-is
+        folder_id = None
+        if prompt_data.folder_path:
+            folder_id = self._create_folder_hierarchy(session, prompt_data.folder_path).id
+        
+        # Create prompt
+        prompt_db = PromptDB(
+            title=prompt_data.title,
+            content=prompt_data.content,
+            description=prompt_data.description,
+            folder_id=folder_id
+        )
+        session.add(prompt_db)
+        session.flush()  # Get the ID
+        
+        # Add tags
+        if prompt_data.tags:
+            prompt_db.tags = self._get_or_create_tags(session, prompt_data.tags)
+        
+        return prompt_db
+    
+    def _insert_prompt_chunk(self, session: Session, chunk: List[PromptCreate]) -> List[int]:
+        """Insert prompts and their tag links with one statement each, resolving folders and tags in bulk."""
+        folders = self._resolve_folders(session, {p.folder_path for p in chunk if p.folder_path})
+        tag_ids = {
+            tag.name: tag.id
+            for tag in self._get_or_create_tags(session, [name for p in chunk for name in p.tags])
+        }
+        
+        prompt_ids = session.scalars(
+            insert(PromptDB).returning(PromptDB.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": p.title,
+                    "content": p.content,
+                    "description": p.description,
+                    "folder_id": folders[p.folder_path].id if p.folder_path else None,
+                }
+                for p in chunk
+            ]
+        ).all()
+        
+        links = [
+            {"prompt_id": prompt_id, "tag_id": tag_ids[name]}
+            for prompt_id, p in zip(prompt_ids, chunk)
+            for name in dict.fromkeys(p.tags)
+        ]
+        if links:
+            session.execute(insert(prompt_tags), links)
+        
+        return prompt_ids
+    
+    def _get_or_create_tags(self, session: Session, names: List[str]) -> List[TagDB]:
+        """Resolve tag names with one query, creating missing ones as custom tags."""
+        names = list(dict.fromkeys(names))  # Drop duplicates, keep order
+        cache = session.info["tag_by_name"]
+        
+        uncached = [name for name in names if name not in cache]
+        if uncached:
+            cache.update(
+                (tag.name, tag)
+                for tag in session.query(TagDB).filter(TagDB.name.in_(uncached)).all()
+            )
+        
+        missing = [TagDB(name=name, category="custom") for name in names if name not in cache]
+        if missing:
+            session.add_all(missing)
+            session.flush()
+            cache.update((tag.name, tag) for tag in missing)
+        
+        return [cache[name] for name in names]
+    
     def _create_folder_hierarchy(self, session: Session, path: str) -> FolderDB:
-        """Create folder hierarchy for a given path."""
+        """Get the folder for a path, creating it and any missing ancestors."""
         parts = [p for p in path.split('/') if p]
-        current_path = ""
-        parent_id = None
+        if not parts:
+            return self._get_folder_db(session, "/")
         
-        for part in parts:
-            current_path += f"/{part}"
-            
-            folder = session.query(FolderDB).filter_by(path=current_path).first()
-            if not folder:
-                folder = FolderDB(name=part, path=current_path, parent_id=parent_id)
+        # Fetch every uncached ancestor that already exists in one query
+        candidate_paths = self._ancestor_paths(path)
+        self._load_folders(session, candidate_paths)
+        cache = session.info["folder_by_path"]
+        
+        folder = None
+        created = False
+        for part, current_path in zip(parts, candidate_paths):
+            parent = folder
+            folder = cache.get(current_path)
+            if folder is None:
+                # Link through the relationship so IDs are assigned in one flush
+                folder = FolderDB(name=part, path=current_path, parent=parent)
                 session.add(folder)
-                session.flush()
-            
-            parent_id = folder.id
+                cache[current_path] = folder
+                created = True
+        
+        if created:
+            session.flush()
         
         return folder
     
+    def _insert_folder_chain(self, session: Session, path: str):
+        """Insert a path's folder and ancestors with INSERT OR IGNORE, skipping the ones that exist."""
+        rows = []
+        for ancestor in self._ancestor_paths(path):
+            parent_path, name = ancestor.rsplit('/', 1)
+            # Top-level folders have no parent, matching _create_folder_hierarchy
+            rows.append({"name": name, "path": ancestor, "parent_path": parent_path or None})
+        if not rows:
+            return
+        
+        # Rows run in order, so each parent exists by the time its child looks it up
+        parent_id = select(FolderDB.id).where(FolderDB.path == bindparam("parent_path")).scalar_subquery()
+        session.connection().execute(
+            sqlite_insert(FolderDB)
+            .values(name=bindparam("name"), path=bindparam("path"), parent_id=parent_id)
+            .on_conflict_do_nothing(index_elements=["path"]),
+            rows
+        )
+    
+    def _resolve_folders(self, session: Session, paths: Iterable[str]) -> Dict[str, FolderDB]:
+        """Get or create the folders for several paths, loading all their ancestors in one query."""
+        paths = list(paths)
+        self._load_folders(session, [ancestor for path in paths for ancestor in self._ancestor_paths(path)])
+        return {path: self._create_folder_hierarchy(session, path) for path in paths}
+    
+    def _load_folders(self, session: Session, paths: List[str]):
+        """Load any of the given folder paths missing from the session cache."""
+        cache = session.info["folder_by_path"]
+        uncached = list({p for p in paths if p not in cache})
+        if uncached:
+            cache.update(
+                (folder.path, folder)
+                for folder in session.query(FolderDB).filter(FolderDB.path.in_(uncached))
+            )
+    
+    @staticmethod
+    def _subtree_filter(path: str):
+        """Match a folder and its descendants with a range scan on the unique path index."""
+        # Descendant paths sort between "<path>/" and "<path>0", '0' being the character after '/'
+        return or_(
+            FolderDB.path == path,
+            and_(FolderDB.path >= path + "/", FolderDB.path < path + "0")
+        )
+    
+    @staticmethod
+    def _ancestor_paths(path: str) -> List[str]:
+        """List the normalized paths from the top-level folder down to ``path``."""
+        parts = [p for p in path.split('/') if p]
+        return ["/" + "/".join(parts[:i + 1]) for i in range(len(parts))]
+    
+    def _tag_db_to_pydantic(self, tag_db: TagDB) -> Tag:
+        """Convert a stored tag without re-validating it."""
+        return Tag.model_construct(
+            id=tag_db.id,
+            name=tag_db.name,
+            category=tag_db.category,
+            color=tag_db.color,
+            created_at=tag_db.created_at
+        )
+    
+    def _folder_db_to_pydantic(self, folder_db: FolderDB, prompt_count: int = 0) -> Folder:
+        """Convert a stored folder without re-validating it or loading its subfolders."""
+        return Folder.model_construct(
+            id=folder_db.id,
+            name=folder_db.name,
+            path=_intern_path(folder_db.path),
+            parent_id=folder_db.parent_id,
+            created_at=folder_db.created_at,
+            children=[],
+            prompt_count=prompt_count
+        )
+    
+    def _prompt_db_to_pydantic_fast(self, prompt_db: PromptDB) -> Prompt:
+        """Convert a prompt loaded with _prompt_list_load_options() without re-validating DB values."""
+        folder = prompt_db.folder
+        tags = [
+            Tag.model_construct(id=tag.id, name=tag.name, category=tag.category, color=tag.color, created_at=None)
+            for tag in prompt_db.tags
+        ]
+        
+        return Prompt.model_construct(
+            id=prompt_db.id,
+            title=prompt_db.title,
+            content=prompt_db.content,
+            description=prompt_db.description,
+            folder_id=prompt_db.folder_id,
+            folder_path=_intern_path(folder.path) if folder else None,
+            created_at=prompt_db.created_at,
+            updated_at=prompt_db.updated_at,
+            tags=tags,
+            tags_csv=", ".join(tag.name for tag in tags) or None
+        )
+    
     def _prompt_db_to_pydantic(self, session: Session, prompt_db: PromptDB) -> Prompt:
-        """Convert SQLAlchemy prompt to Pydantic model."""
+        """Convert SQLAlchemy prompt to Pydantic model, trusting the stored values."""
         folder_path = None
         if prompt_db.folder:
-            folder_path = prompt_db.folder.path
+            folder_path = _intern_path(prompt_db.folder.path)
         
-        tags = [Tag.model_validate(tag) for tag in prompt_db.tags]
+        tags = [self._tag_db_to_pydantic(tag) for tag in prompt_db.tags]
         
-        return Prompt(
+        return Prompt.model_construct(
             id=prompt_db.id,
             title=prompt_db.title,
             content=prompt_db.content,
@@ -353,5 +973,16 @@ class Database:
             folder_path=folder_path,
             created_at=prompt_db.created_at,
             updated_at=prompt_db.updated_at,
-            tags=tags
+            tags=tags,
+            tags_csv=", ".join(tag.name for tag in tags) or None
         )
+
+
+def get_database(db_path: Optional[str] = None) -> Database:
+    """Return the process-wide Database for a path, creating it on first use."""
+    key = os.path.abspath(db_path) if db_path else ""
+    with _SINGLETONS_LOCK:
+        db = _SINGLETONS.get(key)
+        if db is None:
+            db = _SINGLETONS[key] = Database(db_path)
+        return db
@@ -4,22 +4,386 @@ Stdio-based MCP server for Claude Desktop integration.
 This implements the MCP protocol over stdin/stdout for direct Claude Desktop integration.
 """
 
+import functools
 import json
+import re
 import sys
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
 
-from .database import Database
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .database import Database, get_database
 from .models import PromptSearch, PromptCreate, PromptUpdate
 
 
+# Longest JSON-RPC line accepted on stdin; prompt content travels inline
+STDIN_LINE_LIMIT = 16 * 1024 * 1024
+
+# Bytes requested from stdin per read; every complete line in a chunk is handled before reading again
+STDIN_CHUNK_SIZE = 64 * 1024
+
+# Requests are handled concurrently by a fixed pool of workers fed from a bounded queue
+WORKER_COUNT = 4
+REQUEST_QUEUE_SIZE = 64
+
+# Tools that change the database. Each one waits for the requests before it and
+# finishes before later ones start, so pipelined writes apply in the order sent.
+_MUTATING_TOOLS = frozenset((
+    "create_prompt", "update_prompt", "delete_prompt",
+    "create_folder", "update_folder", "delete_folder",
+    "create_tag", "update_tag", "delete_tag",
+))
+
+# Most prompts listed by resources/list
+RESOURCES_LIST_LIMIT = 1000
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a JSON-RPC line straight from bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """Format a timestamp for tool results, passing None through."""
+    return value.isoformat() if value is not None else None
+
+
+def _prompt_out(prompt, with_created_at: bool = False) -> Dict[str, Any]:
+    """Fixed-shape prompt payload shared by the tool results."""
+    out = {
+        "id": prompt.id,
+        "title": prompt.title,
+        "content": prompt.content,
+        "description": prompt.description,
+        "folder_path": prompt.folder_path,
+        "tags": prompt.tag_names
+    }
+    if with_created_at:
+        out["created_at"] = _iso(prompt.created_at)
+    return out
+
+
+# Error replies written by the workers, with the id and detail spliced in as encoded JSON
+_ERR_METHOD_NOT_FOUND = b'{"jsonrpc":"2.0","id":%b,"error":{"code":-32601,"message":%b}}'
+_ERR_INTERNAL = b'{"jsonrpc":"2.0","id":%b,"error":{"code":-32603,"message":"Internal error","data":%b}}'
+
+# Compact-encoded notification method, matched on raw stdin lines
+_NOTIFICATION_MARKER = b'"method":"notifications/'
+
+# Support both Claude (2025-06-18) and Perplexity (2024-11-05) versions
+_SUPPORTED_VERSIONS = frozenset(("2024-11-05", "2025-06-18"))
+_LATEST_VERSION = "2025-06-18"
+
+# Constant part of the initialize result; shared between replies and never mutated
+_INIT_BASE = {
+    "capabilities": {
+        "resources": {"subscribe": True, "listChanged": False},
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "prompt-bookmarks",
+        "version": "0.1.0"
+    }
+}
+
+# Template variables are written as {name} or {{name}}
+_VAR_RE = re.compile(r"\{\{([^{}]+)\}\}|\{([^{}]+)\}")
+
+
+@functools.lru_cache(maxsize=8192)
+def _normalize_path(path: str) -> str:
+    """Canonical folder path: one leading slash, no trailing or repeated slashes."""
+    return "/" + "/".join(part for part in path.split("/") if part)
+
+
+def _is_mutating(request: Any) -> bool:
+    """Whether a request is a tools/call of a tool that changes the database."""
+    if not isinstance(request, dict) or request.get("method") != "tools/call":
+        return False
+    params = request.get("params")
+    return isinstance(params, dict) and params.get("name") in _MUTATING_TOOLS
+
+
+def _substitute_variables(content: str, variables: Dict[str, Any]) -> str:
+    """Replace known template variables in one pass, leaving unknown ones as written."""
+    if not variables:
+        return content
+    
+    def replace(match):
+        key = match.group(1) or match.group(2)
+        return str(variables[key]) if key in variables else match.group(0)
+    
+    return _VAR_RE.sub(replace, content)
+
+
+# Tool definitions are constant, so tools/list is encoded once at import time
+_TOOLS_LIST = [
+    {
+        "name": "search_prompts",
+        "description": "Search for prompts by query, tags, or folder",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query"},
+                "tags": {"type": "array", "items": {"type": "string"}, "description": "Filter by tags"},
+                "folder_path": {"type": "string", "description": "Filter by folder"},
+                "folder_path_prefix": {"type": "string", "description": "Filter by folder and all of its subfolders"},
+                "limit": {"type": "integer", "default": 10}
+            },
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "create_prompt",
+        "description": "Create a new prompt",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "Prompt title"},
+                "content": {"type": "string", "description": "Prompt content"},
+                "description": {"type": "string", "description": "Optional description"},
+                "folder_path": {"type": "string", "description": "Folder path"},
+                "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags"}
+            },
+            "required": ["title", "content"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "get_prompt",
+        "description": "Get a prompt by ID for immediate use",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prompt_id": {"type": "integer", "description": "Prompt ID"}
+            },
+            "required": ["prompt_id"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "use_prompt_template",
+        "description": "Use a prompt template with variable substitution",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prompt_id": {"type": "integer", "description": "Prompt ID"},
+                "variables": {"type": "object", "description": "Variables to substitute"}
+            },
+            "required": ["prompt_id"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "find_and_use_prompt",
+        "description": "Search for and use a prompt with variables",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query"},
+                "variables": {"type": "object", "description": "Variables to substitute"}
+            },
+            "required": ["query"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "update_prompt",
+        "description": "Update an existing prompt's title, content, description, folder, or tags",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prompt_id": {"type": "integer", "description": "Prompt ID to update"},
+                "title": {"type": "string", "description": "New prompt title"},
+                "content": {"type": "string", "description": "New prompt content"},
+                "description": {"type": "string", "description": "New description"},
+                "folder_path": {"type": "string", "description": "New folder path"},
+                "tags": {"type": "array", "items": {"type": "string"}, "description": "New tags (replaces all existing tags)"}
+            },
+            "required": ["prompt_id"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "delete_prompt",
+        "description": "Delete a prompt by ID",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "prompt_id": {"type": "integer", "description": "Prompt ID to delete"}
+            },
+            "required": ["prompt_id"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "get_folders",
+        "description": "List all folders in the prompt library",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "create_folder",
+        "description": "Create a new folder path",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "folder_path": {"type": "string", "description": "Folder path to create (e.g., 'AI/Coding/Python')"}
+            },
+            "required": ["folder_path"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "delete_folder",
+        "description": "Delete a folder and move its prompts to the parent folder",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "folder_path": {"type": "string", "description": "Folder path to delete (e.g., 'AI/Coding/Python')"}
+            },
+            "required": ["folder_path"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "update_folder",
+        "description": "Rename a folder (updates the folder path and all child folders/prompts)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "old_path": {"type": "string", "description": "Current folder path (e.g., 'AI/Coding')"},
+                "new_path": {"type": "string", "description": "New folder path (e.g., 'AI/Development')"}
+            },
+            "required": ["old_path", "new_path"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "get_tags",
+        "description": "List all tags in the prompt library",
+        "inputSchema": {
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "create_tag",
+        "description": "Create a new tag",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Tag name"},
+                "category": {"type": "string", "description": "Tag category (optional)"},
+                "color": {"type": "string", "description": "Hex color code (optional, e.g., '#FF5733')"}
+            },
+            "required": ["name"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "update_tag",
+        "description": "Update an existing tag's name, category, or color",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "current_name": {"type": "string", "description": "Current tag name"},
+                "new_name": {"type": "string", "description": "New tag name (optional)"},
+                "category": {"type": "string", "description": "New category (optional)"},
+                "color": {"type": "string", "description": "New hex color code (optional, e.g., '#FF5733')"}
+            },
+            "required": ["current_name"],
+            "additionalProperties": False
+        }
+    },
+    {
+        "name": "delete_tag",
+        "description": "Delete a tag by name",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Tag name to delete"}
+            },
+            "required": ["name"],
+            "additionalProperties": False
+        }
+    }
+]
+_TOOLS_RESULT_JSON = _json_dumps({"tools": _TOOLS_LIST})
+
+_SCHEMA_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+}
+
+
+def _compile_input_schema(schema: Dict[str, Any]):
+    """Turn a tool inputSchema into a validator returning an error message, or None when valid."""
+    required = tuple(schema.get("required", ()))
+    closed = schema.get("additionalProperties", True) is False
+    checks = {}
+    for name, prop in schema.get("properties", {}).items():
+        items = prop.get("items", {}).get("type")
+        checks[name] = (prop["type"], _SCHEMA_TYPES[prop["type"]], items, _SCHEMA_TYPES.get(items))
+    
+    def validate(arguments: Any) -> Optional[str]:
+        if not isinstance(arguments, dict):
+            return "arguments must be an object"
+        for name in required:
+            if arguments.get(name) is None:
+                return f"'{name}' is required"
+        for name, value in arguments.items():
+            check = checks.get(name)
+            if check is None:
+                if closed:
+                    return f"unexpected argument '{name}'"
+                continue
+            # Clients send null for optional arguments they leave out
+            if value is None:
+                continue
+            type_name, is_type, items_name, is_item = check
+            if not is_type(value):
+                return f"'{name}' must be of type {type_name}"
+            if is_item is not None and not all(is_item(item) for item in value):
+                return f"'{name}' items must be of type {items_name}"
+        return None
+    
+    return validate
+
+
+# Argument validators, compiled once from the published schemas
+_VALIDATORS = {tool["name"]: _compile_input_schema(tool["inputSchema"]) for tool in _TOOLS_LIST}
+
+
 class MCPStdioServer:
     """MCP server that communicates via stdin/stdout for Claude Desktop."""
     
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize MCP stdio server."""
-        self.db = Database(db_path)
+    def __init__(self, db_path: Optional[str] = None, db: Optional[Database] = None):
+        """Initialize MCP stdio server with a database path or an existing Database."""
+        self.db = db if db is not None else get_database(db_path)
         
         # Set up logging to stderr so it doesn't interfere with JSON communication
         logging.basicConfig(
@@ -28,60 +392,172 @@ class MCPStdioServer:
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger(__name__)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._out = sys.stdout.buffer  # Write encoded bytes, skipping print() and text-layer encoding
     
-    async def run(self):
-        """Run the MCP server, reading from stdin and writing to stdout."""
+    def run_blocking(self):
+        """Run the server from synchronous code, reusing a host event loop if one is running."""
+        # Warm SQLAlchemy up while the client is still doing its handshake
+        threading.Thread(target=self._warmup_db, daemon=True).start()
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            # Calling asyncio.run() here would fail with "already running"
+            return loop.create_task(self.run())
+        
+        if hasattr(asyncio, "Runner"):
+            with asyncio.Runner() as runner:
+                runner.run(self.run())
+        else:
+            asyncio.run(self.run())
+    
+    def _warmup_db(self):
+        """Pre-warm the database, logging instead of failing since this is best effort."""
+        try:
+            self.db.warmup()
+        except Exception as e:
+            self.logger.error(f"Database warmup failed: {e}")
+    
+    async def _open_stdin(self):
+        """Attach stdin to the event loop and return a coroutine function that reads a chunk."""
+        loop = asyncio.get_running_loop()
+        self._reader = asyncio.StreamReader()
         try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self._reader), sys.stdin)
+        except (ValueError, OSError, NotImplementedError):
+            # Regular files and some Windows consoles can't be watched by the loop
+            self._reader = None
+            
+            async def read_chunk():
+                return await loop.run_in_executor(None, sys.stdin.buffer.read1, STDIN_CHUNK_SIZE)
+            
+            return read_chunk
+        
+        return lambda: self._reader.read(STDIN_CHUNK_SIZE)
+    
+    async def _read_lines(self):
+        """Yield complete stdin lines, draining every line already buffered per read."""
+        read_chunk = await self._open_stdin()
+        buffer = bytearray()
+        discarding = False  # Inside an oversized line, skipping to its end
+        
+        while True:
+            chunk = await read_chunk()
+            if not chunk:
+                break
+            buffer += chunk
+            
+            start = 0
             while True:
-                line = sys.stdin.readline()
-                if not line:
+                newline = buffer.find(b"\n", start)
+                if newline == -1:
                     break
+                if not discarding:
+                    yield bytes(buffer[start:newline])
+                discarding = False
+                start = newline + 1
+            del buffer[:start]
+            
+            if len(buffer) > STDIN_LINE_LIMIT:
+                if not discarding:
+                    self.logger.error(f"Request line exceeds {STDIN_LINE_LIMIT} bytes, skipped")
+                buffer.clear()
+                discarding = True
+        
+        if buffer and not discarding:
+            yield bytes(buffer)  # Last line without a trailing newline
+    
+    async def run(self):
+        """Run the MCP server, reading from stdin and writing to stdout."""
+        self._write_lock = asyncio.Lock()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=REQUEST_QUEUE_SIZE)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(WORKER_COUNT)]
+        
+        try:
+            async for line in self._read_lines():
+                if not line.strip():
+                    continue
+                
+                # Notifications never get a reply; skip them unparsed. A line with an
+                # "id" may only carry the text in nested arguments, so it is parsed.
+                if _NOTIFICATION_MARKER in line and b'"id"' not in line:
+                    continue
                 
                 try:
-                    request = json.loads(line.strip())
-                    response = await self.handle_request(request)
-                    if response:
-                        print(json.dumps(response), flush=True)
-                except json.JSONDecodeError:
+                    request = _json_loads(line)
+                except ValueError:  # Invalid JSON or invalid UTF-8
                     self.logger.error(f"Invalid JSON received: {line}")
-                except Exception as e:
-                    self.logger.error(f"Error handling request: {e}")
-                    error_response = {
-                        "jsonrpc": "2.0",
-                        "id": request.get("id") if 'request' in locals() else None,
-                        "error": {
-                            "code": -32603,
-                            "message": "Internal error",
-                            "data": str(e)
-                        }
-                    }
-                    print(json.dumps(error_response), flush=True)
+                    continue
+                
+                if _is_mutating(request):
+                    # Earlier requests finish first, and later ones are not read until this one is answered
+                    await queue.join()
+                    await self._handle_queued(request)
+                else:
+                    await queue.put(request)
+            
+            # Answer everything already read before shutting down
+            await queue.join()
         except Exception as e:
             self.logger.error(f"Fatal error in MCP server: {e}")
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
     
-    async def handle_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Handle incoming MCP request."""
+    async def _worker(self, queue: asyncio.Queue):
+        """Handle queued requests one at a time until cancelled."""
+        while True:
+            request = await queue.get()
+            try:
+                await self._handle_queued(request)
+            finally:
+                queue.task_done()
+    
+    async def _handle_queued(self, request: Any):
+        """Handle one request read from stdin and write its reply."""
+        request_id = request.get("id") if isinstance(request, dict) else None
+        method = request.get("method") if isinstance(request, dict) else None
+        try:
+            if isinstance(method, str) and method not in self._METHOD_DISPATCH:
+                await self._write(_ERR_METHOD_NOT_FOUND % (
+                    _json_dumps(request_id), _json_dumps(f"Method not found: {method}")
+                ))
+                return
+            
+            response = await self.handle_request(request)
+            if response:
+                await self._write(response)
+        except Exception as e:
+            self.logger.error(f"Error handling request: {e}")
+            await self._write(_ERR_INTERNAL % (_json_dumps(request_id), _json_dumps(str(e))))
+    
+    async def _write(self, message):
+        """Write one JSON-RPC message (a dict or pre-encoded bytes) to stdout without interleaving replies."""
+        data = message if isinstance(message, bytes) else _json_dumps(message)
+        async with self._write_lock:
+            self._out.write(data)
+            self._out.write(b"\n")
+            self._out.flush()  # One flush per reply; the client waits on each line
+    
+    async def _db_call(self, func, *args, **kwargs):
+        """Run a blocking Database call on the default executor so other requests keep being served."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    
+    async def handle_request(self, request: Dict[str, Any]) -> Optional[Union[Dict[str, Any], bytes]]:
+        """Handle incoming MCP request; the reply is a dict or an already encoded message."""
         method = request.get("method")
         params = request.get("params", {})
         request_id = request.get("id")
         
-        if method == "initialize":
-            return await self.handle_initialize(request_id, params)
-        elif method == "resources/list":
-            return await self.handle_resources_list(request_id, params)
-        elif method == "resources/read":
-            return await self.handle_resources_read(request_id, params)
-        elif method == "tools/list":
-            return await self.handle_tools_list(request_id, params)
-        elif method == "tools/call":
-            return await self.handle_tools_call(request_id, params)
-        elif method == "notifications/cancelled":
-            # Handle cancellation notifications
-            return None
-        elif method == "notifications/initialized":
-            # Handle initialization complete notification
-            return None
-        else:
+        handler = self._METHOD_DISPATCH.get(method)
+        if handler is None:
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
@@ -90,65 +566,56 @@ class MCPStdioServer:
                     "message": f"Method not found: {method}"
                 }
             }
+        
+        return await handler(self, request_id, params)
+    
+    async def handle_notification(self, request_id: Any, params: Dict[str, Any]) -> None:
+        """Handle notifications (initialized, cancelled), which never get a reply."""
+        return None
     
     async def handle_initialize(self, request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle initialize request with version compatibility."""
         # Get client's requested protocol version
-        client_protocol_version = params.get("protocolVersion", "2025-06-18")
-
-        # Support both Claude (2025-06-18) and Perplexity (2024-11-05) versions
-        supported_versions = ["2024-11-05", "2025-06-18"]
+        client_protocol_version = params.get("protocolVersion", _LATEST_VERSION)
 
         # Use the client's requested version if supported, otherwise use latest
-        protocol_version = client_protocol_version if client_protocol_version in supported_versions else "2025-06-18"
+        protocol_version = client_protocol_version if client_protocol_version in _SUPPORTED_VERSIONS else _LATEST_VERSION
 
         self.logger.info(f"Client requested protocol version: {client_protocol_version}, using: {protocol_version}")
 
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "protocolVersion": protocol_version,
-                "capabilities": {
-                    "resources": {"subscribe": True, "listChanged": False},
-                    "tools": {}
-                },
-                "serverInfo": {
-                    "name": "prompt-bookmarks",
-                    "version": "0.1.0"
-                }
-            }
+            "result": {"protocolVersion": protocol_version, **_INIT_BASE}
         }
     
-    async def handle_resources_list(self, request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle resources/list request."""
+    async def handle_resources_list(self, request_id: Any, params: Dict[str, Any]) -> bytes:
+        """Handle resources/list request, reading and encoding the entries off the event loop."""
         try:
-            prompts, _ = self.db.list_prompts(limit=1000)
-            resources = []
-            
-            for prompt in prompts:
-                resources.append({
-                    "uri": f"prompt:///{prompt.id}",
-                    "name": prompt.title,
-                    "description": prompt.description or f"Prompt: {prompt.content[:100]}...",
-                    "mimeType": "text/plain"
-                })
-            
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {"resources": resources}
-            }
+            entries = await self._db_call(self._encode_resource_entries)
         except Exception as e:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32603,
-                    "message": "Internal error",
-                    "data": str(e)
-                }
-            }
+            self.logger.error(f"resources/list failed: {e}")
+            return _ERR_INTERNAL % (_json_dumps(request_id), _json_dumps(str(e)))
+        
+        return b'{"jsonrpc":"2.0","id":' + _json_dumps(request_id) + b',"result":{"resources":[' + entries + b']}}'
+    
+    def _encode_resource_entries(self) -> bytes:
+        """Encode the resources/list entries as a comma-separated run of JSON objects."""
+        return b",".join(
+            _json_dumps(self._resource_entry(row))
+            for row in self.db.iter_prompt_summaries(limit=RESOURCES_LIST_LIMIT)
+        )
+    
+    @staticmethod
+    def _resource_entry(row) -> Dict[str, Any]:
+        """Build a resources/list entry from an iter_prompt_summaries() row."""
+        prompt_id, title, description, content_preview = row
+        return {
+            "uri": f"prompt:///{prompt_id}",
+            "name": title,
+            "description": description or f"Prompt: {content_preview}...",
+            "mimeType": "text/plain"
+        }
     
     async def handle_resources_read(self, request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle resources/read request."""
@@ -165,7 +632,7 @@ class MCPStdioServer:
                 }
             
             prompt_id = int(uri.replace("prompt:///", ""))
-            prompt = self.db.get_prompt(prompt_id)
+            prompt = await self._db_call(self.db.get_prompt, prompt_id)
             
             if not prompt:
                 return {
@@ -202,209 +669,9 @@ class MCPStdioServer:
                 }
             }
     
-    async def handle_tools_list(self, request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle tools/list request."""
-        tools = [
-            {
-                "name": "search_prompts",
-                "description": "Search for prompts by query, tags, or folder",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "tags": {"type": "array", "items": {"type": "string"}, "description": "Filter by tags"},
-                        "folder_path": {"type": "string", "description": "Filter by folder"},
-                        "limit": {"type": "integer", "default": 10}
-                    },
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "create_prompt",
-                "description": "Create a new prompt",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "title": {"type": "string", "description": "Prompt title"},
-                        "content": {"type": "string", "description": "Prompt content"},
-                        "description": {"type": "string", "description": "Optional description"},
-                        "folder_path": {"type": "string", "description": "Folder path"},
-                        "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags"}
-                    },
-                    "required": ["title", "content"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "get_prompt",
-                "description": "Get a prompt by ID for immediate use",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "prompt_id": {"type": "integer", "description": "Prompt ID"}
-                    },
-                    "required": ["prompt_id"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "use_prompt_template",
-                "description": "Use a prompt template with variable substitution",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "prompt_id": {"type": "integer", "description": "Prompt ID"},
-                        "variables": {"type": "object", "description": "Variables to substitute"}
-                    },
-                    "required": ["prompt_id"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "find_and_use_prompt",
-                "description": "Search for and use a prompt with variables",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "Search query"},
-                        "variables": {"type": "object", "description": "Variables to substitute"}
-                    },
-                    "required": ["query"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "update_prompt",
-                "description": "Update an existing prompt's title, content, description, folder, or tags",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "prompt_id": {"type": "integer", "description": "Prompt ID to update"},
-                        "title": {"type": "string", "description": "New prompt title"},
-                        "content": {"type": "string", "description": "New prompt content"},
-                        "description": {"type": "string", "description": "New description"},
-                        "folder_path": {"type": "string", "description": "New folder path"},
-                        "tags": {"type": "array", "items": {"type": "string"}, "description": "New tags (replaces all existing tags)"}
-                    },
-                    "required": ["prompt_id"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "delete_prompt",
-                "description": "Delete a prompt by ID",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "prompt_id": {"type": "integer", "description": "Prompt ID to delete"}
-                    },
-                    "required": ["prompt_id"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "get_folders",
-                "description": "List all folders in the prompt library",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "create_folder",
-                "description": "Create a new folder path",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "folder_path": {"type": "string", "description": "Folder path to create (e.g., 'AI/Coding/Python')"}
-                    },
-                    "required": ["folder_path"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "delete_folder",
-                "description": "Delete a folder and move its prompts to the parent folder",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "folder_path": {"type": "string", "description": "Folder path to delete (e.g., 'AI/Coding/Python')"}
-                    },
-                    "required": ["folder_path"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "update_folder",
-                "description": "Rename a folder (updates the folder path and all child folders/prompts)",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "old_path": {"type": "string", "description": "Current folder path (e.g., 'AI/Coding')"},
-                        "new_path": {"type": "string", "description": "New folder path (e.g., 'AI/Development')"}
-                    },
-                    "required": ["old_path", "new_path"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "get_tags",
-                "description": "List all tags in the prompt library",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {},
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "create_tag",
-                "description": "Create a new tag",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "Tag name"},
-                        "category": {"type": "string", "description": "Tag category (optional)"},
-                        "color": {"type": "string", "description": "Hex color code (optional, e.g., '#FF5733')"}
-                    },
-                    "required": ["name"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "update_tag",
-                "description": "Update an existing tag's name, category, or color",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "current_name": {"type": "string", "description": "Current tag name"},
-                        "new_name": {"type": "string", "description": "New tag name (optional)"},
-                        "category": {"type": "string", "description": "New category (optional)"},
-                        "color": {"type": "string", "description": "New hex color code (optional, e.g., '#FF5733')"}
-                    },
-                    "required": ["current_name"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "name": "delete_tag",
-                "description": "Delete a tag by name",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "Tag name to delete"}
-                    },
-                    "required": ["name"],
-                    "additionalProperties": False
-                }
-            }
-        ]
-        
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "result": {"tools": tools}
-        }
+    async def handle_tools_list(self, request_id: Any, params: Dict[str, Any]) -> bytes:
+        """Handle tools/list request by splicing the pre-encoded tool list into the envelope."""
+        return b'{"jsonrpc":"2.0","id":' + _json_dumps(request_id) + b',"result":' + _TOOLS_RESULT_JSON + b'}'
     
     async def handle_tools_call(self, request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/call request."""
@@ -412,37 +679,8 @@ class MCPStdioServer:
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
             
-            if tool_name == "search_prompts":
-                result = await self._search_prompts_tool(arguments)
-            elif tool_name == "create_prompt":
-                result = await self._create_prompt_tool(arguments)
-            elif tool_name == "get_prompt":
-                result = await self._get_prompt_tool(arguments)
-            elif tool_name == "use_prompt_template":
-                result = await self._use_prompt_template_tool(arguments)
-            elif tool_name == "find_and_use_prompt":
-                result = await self._find_and_use_prompt_tool(arguments)
-            elif tool_name == "update_prompt":
-                result = await self._update_prompt_tool(arguments)
-            elif tool_name == "delete_prompt":
-                result = await self._delete_prompt_tool(arguments)
-            elif tool_name == "get_folders":
-                result = await self._get_folders_tool(arguments)
-            elif tool_name == "create_folder":
-                result = await self._create_folder_tool(arguments)
-            elif tool_name == "delete_folder":
-                result = await self._delete_folder_tool(arguments)
-            elif tool_name == "update_folder":
-                result = await self._update_folder_tool(arguments)
-            elif tool_name == "get_tags":
-                result = await self._get_tags_tool(arguments)
-            elif tool_name == "create_tag":
-                result = await self._create_tag_tool(arguments)
-            elif tool_name == "update_tag":
-                result = await self._update_tag_tool(arguments)
-            elif tool_name == "delete_tag":
-                result = await self._delete_tag_tool(arguments)
-            else:
+            handler = self._TOOL_DISPATCH.get(tool_name)
+            if handler is None:
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
@@ -452,13 +690,26 @@ class MCPStdioServer:
                     }
                 }
             
+            problem = _VALIDATORS[tool_name](arguments)
+            if problem is not None:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {
+                        "code": -32602,
+                        "message": f"Invalid arguments for {tool_name}: {problem}"
+                    }
+                }
+            
+            result = await handler(self, arguments)
+            
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
                 "result": {
                     "content": [{
                         "type": "text",
-                        "text": json.dumps(result, indent=2)
+                        "text": _json_dumps(result).decode()
                     }]
                 }
             }
@@ -478,23 +729,14 @@ class MCPStdioServer:
         search_params = PromptSearch(
             query=arguments.get("query"),
             tags=arguments.get("tags", []),
-            folder_path=arguments.get("folder_path"),
+            folder_path=_normalize_path(arguments["folder_path"]) if arguments.get("folder_path") else None,
+            folder_path_prefix=_normalize_path(arguments["folder_path_prefix"]) if arguments.get("folder_path_prefix") else None,
             limit=arguments.get("limit", 10)
         )
         
-        prompts, total = self.db.search_prompts(search_params)
+        prompts, total = await self._db_call(self.db.search_prompts, search_params)
         
-        results = []
-        for prompt in prompts:
-            results.append({
-                "id": prompt.id,
-                "title": prompt.title,
-                "content": prompt.content,
-                "description": prompt.description,
-                "folder_path": prompt.folder_path,
-                "tags": [tag.name for tag in prompt.tags],
-                "created_at": prompt.created_at.isoformat() if prompt.created_at else None
-            })
+        results = [_prompt_out(prompt, with_created_at=True) for prompt in prompts]
         
         return {
             "prompts": results,
@@ -512,27 +754,18 @@ class MCPStdioServer:
             tags=arguments.get("tags", [])
         )
         
-        prompt = self.db.create_prompt(prompt_data)
+        prompt = await self._db_call(self.db.create_prompt, prompt_data)
         
         return {
             "success": True,
-            "prompt": {
-                "id": prompt.id,
-                "title": prompt.title,
-                "content": prompt.content,
-                "description": prompt.description,
-                "folder_path": prompt.folder_path,
-                "tags": [tag.name for tag in prompt.tags]
-            }
+            "prompt": _prompt_out(prompt)
         }
     
     async def _get_prompt_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Get prompt tool implementation."""
-        prompt_id = arguments.get("prompt_id")
-        if not prompt_id:
-            raise ValueError("prompt_id is required")
+        prompt_id = arguments["prompt_id"]
         
-        prompt = self.db.get_prompt(prompt_id)
+        prompt = await self._db_call(self.db.get_prompt, prompt_id)
         
         if not prompt:
             return {"error": f"Prompt with ID {prompt_id} not found"}
@@ -541,28 +774,22 @@ class MCPStdioServer:
             "prompt_content": prompt.content,
             "title": prompt.title,
             "description": prompt.description,
-            "tags": [tag.name for tag in prompt.tags],
+            "tags": prompt.tag_names,
             "folder_path": prompt.folder_path
         }
     
     async def _use_prompt_template_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Use prompt template tool implementation."""
-        prompt_id = arguments.get("prompt_id")
+        prompt_id = arguments["prompt_id"]
         variables = arguments.get("variables", {})
         
-        if not prompt_id:
-            raise ValueError("prompt_id is required")
-        
-        prompt = self.db.get_prompt(prompt_id)
+        prompt = await self._db_call(self.db.get_prompt, prompt_id)
         
         if not prompt:
             return {"error": f"Prompt with ID {prompt_id} not found"}
         
         # Substitute variables in the prompt content
-        content = prompt.content
-        for key, value in variables.items():
-            content = content.replace(f"{{{key}}}", str(value))
-            content = content.replace(f"{{{{{key}}}}}", str(value))
+        content = _substitute_variables(prompt.content, variables)
         
         return {
             "prompt_content": content,
@@ -570,7 +797,7 @@ class MCPStdioServer:
             "title": prompt.title,
             "variables_used": variables,
             "description": prompt.description,
-            "tags": [tag.name for tag in prompt.tags],
+            "tags": prompt.tag_names,
             "folder_path": prompt.folder_path
         }
     
@@ -582,9 +809,9 @@ class MCPStdioServer:
         if not query:
             raise ValueError("query is required")
         
-        # Search for prompts
-        search_params = PromptSearch(query=query, limit=5)
-        prompts, total = self.db.search_prompts(search_params)
+        # Only the best match is used; the total still comes back with it
+        search_params = PromptSearch(query=query, limit=1)
+        prompts, total = await self._db_call(self.db.search_prompts, search_params)
         
         if not prompts:
             return {"error": f"No prompts found matching '{query}'"}
@@ -593,10 +820,7 @@ class MCPStdioServer:
         best_prompt = prompts[0]
         
         # Substitute variables if provided
-        content = best_prompt.content
-        for key, value in variables.items():
-            content = content.replace(f"{{{key}}}", str(value))
-            content = content.replace(f"{{{{{key}}}}}", str(value))
+        content = _substitute_variables(best_prompt.content, variables)
         
         return {
             "prompt_content": content,
@@ -604,7 +828,7 @@ class MCPStdioServer:
             "prompt_id": best_prompt.id,
             "title": best_prompt.title,
             "description": best_prompt.description,
-            "tags": [tag.name for tag in best_prompt.tags],
+            "tags": best_prompt.tag_names,
             "folder_path": best_prompt.folder_path,
             "variables_used": variables if variables else None,
             "search_results_count": total
@@ -612,17 +836,9 @@ class MCPStdioServer:
     
     async def _update_prompt_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Update prompt tool implementation."""
-        prompt_id = arguments.get("prompt_id")
-        if not prompt_id:
-            raise ValueError("prompt_id is required")
-        
-        # Get current prompt
-        current_prompt = self.db.get_prompt(prompt_id)
-        if not current_prompt:
-            return {"error": f"Prompt with ID {prompt_id} not found"}
+        prompt_id = arguments["prompt_id"]
         
         # Prepare update data - only include fields that are provided
-        from .models import PromptUpdate
         update_data = {"id": prompt_id}
         
         if "title" in arguments:
@@ -637,49 +853,39 @@ class MCPStdioServer:
             update_data["tags"] = arguments["tags"]
         
         prompt_update = PromptUpdate(**update_data)
-        updated_prompt = self.db.update_prompt(prompt_id, prompt_update)
+        updated_prompt = await self._db_call(self.db.update_prompt, prompt_id, prompt_update)
+        if not updated_prompt:
+            return {"error": f"Prompt with ID {prompt_id} not found"}
         
         return {
             "success": True,
-            "prompt": {
-                "id": updated_prompt.id,
-                "title": updated_prompt.title,
-                "content": updated_prompt.content,
-                "description": updated_prompt.description,
-                "folder_path": updated_prompt.folder_path,
-                "tags": [tag.name for tag in updated_prompt.tags]
-            }
+            "prompt": _prompt_out(updated_prompt)
         }
     
     async def _delete_prompt_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Delete prompt tool implementation."""
-        prompt_id = arguments.get("prompt_id")
-        if not prompt_id:
-            raise ValueError("prompt_id is required")
+        prompt_id = arguments["prompt_id"]
         
-        # Check if prompt exists
-        prompt = self.db.get_prompt(prompt_id)
-        if not prompt:
+        # Delete the prompt; the title comes back from the DELETE itself
+        title = await self._db_call(self.db.delete_prompt, prompt_id)
+        if title is None:
             return {"error": f"Prompt with ID {prompt_id} not found"}
         
-        # Delete the prompt
-        self.db.delete_prompt(prompt_id)
-        
         return {
             "success": True,
-            "message": f"Deleted prompt '{prompt.title}' (ID: {prompt_id})"
+            "message": f"Deleted prompt '{title}' (ID: {prompt_id})"
         }
     
     async def _get_folders_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Get folders tool implementation."""
-        folders = self.db.list_folders()
+        folders = await self._db_call(self.db.list_folders)
         
         return {
             "folders": [
                 {
                     "path": folder.path,
                     "prompt_count": folder.prompt_count,
-                    "created_at": folder.created_at.isoformat() if folder.created_at else None
+                    "created_at": _iso(folder.created_at)
                 }
                 for folder in folders
             ],
@@ -691,17 +897,10 @@ class MCPStdioServer:
         folder_path = arguments.get("folder_path")
         if not folder_path:
             raise ValueError("folder_path is required")
+        folder_path = _normalize_path(folder_path)
         
-        # Create folder by creating a dummy prompt and then deleting it
-        # This ensures the folder structure exists
-        from .models import PromptCreate
-        temp_prompt = PromptCreate(
-            title="__temp__",
-            content="temp",
-            folder_path=folder_path
-        )
-        created_prompt = self.db.create_prompt(temp_prompt)
-        self.db.delete_prompt(created_prompt.id)
+        # Create the folder and any missing parents in one transaction
+        await self._db_call(self.db.ensure_folder, folder_path)
         
         return {
             "success": True,
@@ -715,19 +914,11 @@ class MCPStdioServer:
         if not folder_path:
             raise ValueError("folder_path is required")
         
-        # Ensure folder_path starts with /
-        if not folder_path.startswith("/"):
-            folder_path = "/" + folder_path
-        
-        # Check if folder exists and get info before deletion
-        folders = self.db.list_folders()
-        target_folder = None
-        for folder in folders:
-            if folder.path == folder_path:
-                target_folder = folder
-                break
+        folder_path = _normalize_path(folder_path)
         
-        if not target_folder:
+        # Check if folder exists and count its prompts before deletion
+        prompt_count = await self._db_call(self.db.folder_prompt_count, folder_path)
+        if prompt_count is None:
             return {"error": f"Folder '{folder_path}' not found"}
         
         # Check if it's the root folder
@@ -735,13 +926,13 @@ class MCPStdioServer:
             return {"error": "Cannot delete the root folder"}
         
         # Delete the folder
-        success = self.db.delete_folder(folder_path)
+        success = await self._db_call(self.db.delete_folder, folder_path)
         
         if success:
             return {
                 "success": True,
                 "folder_path": folder_path,
-                "message": f"Deleted folder '{folder_path}' and moved {target_folder.prompt_count} prompts to parent folder"
+                "message": f"Deleted folder '{folder_path}' and moved {prompt_count} prompts to parent folder"
             }
         else:
             return {"error": f"Failed to delete folder '{folder_path}'"}
@@ -754,27 +945,8 @@ class MCPStdioServer:
         if not old_path or not new_path:
             raise ValueError("Both old_path and new_path are required")
         
-        # Ensure paths start with /
-        if not old_path.startswith("/"):
-            old_path = "/" + old_path
-        if not new_path.startswith("/"):
-            new_path = "/" + new_path
-        
-        # Check if old folder exists
-        folders = self.db.list_folders()
-        old_folder = None
-        for folder in folders:
-            if folder.path == old_path:
-                old_folder = folder
-                break
-        
-        if not old_folder:
-            return {"error": f"Folder '{old_path}' not found"}
-        
-        # Check if new path already exists
-        for folder in folders:
-            if folder.path == new_path:
-                return {"error": f"Folder '{new_path}' already exists"}
+        old_path = _normalize_path(old_path)
+        new_path = _normalize_path(new_path)
         
         # Check if it's the root folder
         if old_path == "/":
@@ -785,104 +957,45 @@ class MCPStdioServer:
             return {"error": f"Cannot move folder to be a child of itself"}
         
         try:
-            # Get all folders that need to be updated (old folder and its children)
-            folders_to_update = []
-            for folder in folders:
-                if folder.path == old_path or folder.path.startswith(old_path + "/"):
-                    folders_to_update.append(folder)
-            
-            # Get all prompts that need to be updated
-            prompts_to_update = []
-            # Search for prompts in the old folder and its children
-            from .models import PromptSearch
-            
-            # Get prompts directly in the old folder
-            search_params = PromptSearch(folder_path=old_path, limit=1000)
-            prompts_in_folder, _ = self.db.search_prompts(search_params)
-            prompts_to_update.extend(prompts_in_folder)
-            
-            # Get prompts in child folders by searching for each child folder
-            for folder in folders_to_update:
-                if folder.path != old_path:  # Skip the main folder, already got those
-                    search_params = PromptSearch(folder_path=folder.path, limit=1000)
-                    child_prompts, _ = self.db.search_prompts(search_params)
-                    prompts_to_update.extend(child_prompts)
-            
-            # Create the new folder structure
-            for folder in folders_to_update:
-                # Calculate new path for this folder
-                if folder.path == old_path:
-                    folder_new_path = new_path
-                else:
-                    # Replace the old_path prefix with new_path
-                    folder_new_path = new_path + folder.path[len(old_path):]
-                
-                # Create the new folder (this will create parent hierarchy if needed)
-                self._create_folder_if_not_exists(folder_new_path)
-            
-            # Update all prompts to use new folder paths
-            from .models import PromptUpdate
-            for prompt in prompts_to_update:
-                if prompt.folder_path == old_path:
-                    prompt_new_path = new_path
-                else:
-                    prompt_new_path = new_path + prompt.folder_path[len(old_path):]
-                
-                prompt_update = PromptUpdate(
-                    id=prompt.id,
-                    folder_path=prompt_new_path
-                )
-                self.db.update_prompt(prompt.id, prompt_update)
-            
-            # Delete old folder structure (in reverse order to handle children first)
-            folders_to_update.sort(key=lambda f: f.path.count('/'), reverse=True)
-            for folder in folders_to_update:
-                self.db.delete_folder(folder.path)
+            # Existence checks and the rename share one transaction, committed once
+            renamed = await self._db_call(self.db.rename_folder_subtree, old_path, new_path)
+            if renamed is None:
+                return {"error": f"Folder '{old_path}' not found"}
+            folders_updated, prompts_updated = renamed
             
             return {
                 "success": True,
                 "old_path": old_path,
                 "new_path": new_path,
-                "folders_updated": len(folders_to_update),
-                "prompts_updated": len(prompts_to_update),
-                "message": f"Renamed folder '{old_path}' to '{new_path}' and updated {len(folders_to_update)} folders and {len(prompts_to_update)} prompts"
+                "folders_updated": folders_updated,
+                "prompts_updated": prompts_updated,
+                "message": f"Renamed folder '{old_path}' to '{new_path}' and updated {folders_updated} folders and {prompts_updated} prompts"
             }
             
+        except ValueError as e:
+            return {"error": str(e)}
         except Exception as e:
             return {"error": f"Failed to rename folder: {str(e)}"}
     
-    def _create_folder_if_not_exists(self, folder_path: str):
-        """Helper method to create a folder if it doesn't exist."""
-        existing_folders = self.db.list_folders()
-        for folder in existing_folders:
-            if folder.path == folder_path:
-                return  # Folder already exists
-        
-        # Create folder by creating a temp prompt and deleting it
-        from .models import PromptCreate
-        temp_prompt = PromptCreate(
-            title="__temp_for_folder__",
-            content="temp",
-            folder_path=folder_path
-        )
-        created_prompt = self.db.create_prompt(temp_prompt)
-        self.db.delete_prompt(created_prompt.id)
-    
     async def _get_tags_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Get tags tool implementation."""
-        tags = self.db.list_tags()
-        
-        return {
-            "tags": [
+        def tag_entries():
+            # Runs on the executor, so the query and the result rows cost the loop one await
+            return [
                 {
                     "id": tag.id,
                     "name": tag.name,
                     "category": tag.category,
                     "color": tag.color,
-                    "created_at": tag.created_at.isoformat() if tag.created_at else None
+                    "created_at": _iso(tag.created_at)
                 }
-                for tag in tags
-            ],
+                for tag in self.db.list_tags()
+            ]
+        
+        tags = await self._db_call(tag_entries)
+        
+        return {
+            "tags": tags,
             "count": len(tags)
         }
     
@@ -893,7 +1006,7 @@ class MCPStdioServer:
             raise ValueError("name is required")
         
         # Check if tag already exists
-        existing_tag = self.db.get_tag_by_name(name)
+        existing_tag = await self._db_call(self.db.get_tag_by_name, name)
         if existing_tag:
             return {
                 "success": True,
@@ -906,11 +1019,15 @@ class MCPStdioServer:
                 "message": f"Tag '{name}' already exists"
             }
         
-        created_tag = self.db.create_tag(
-            name=name,
-            category=arguments.get("category"),
-            color=arguments.get("color")
-        )
+        try:
+            created_tag = await self._db_call(
+                self.db.create_tag,
+                name=name,
+                category=arguments.get("category"),
+                color=arguments.get("color")
+            )
+        except ValueError as e:
+            return {"error": str(e)}
         
         return {
             "success": True,
@@ -929,45 +1046,33 @@ class MCPStdioServer:
         if not current_name:
             raise ValueError("current_name is required")
         
-        # Check if tag exists
-        existing_tag = self.db.get_tag_by_name(current_name)
-        if not existing_tag:
-            return {"error": f"Tag '{current_name}' not found"}
-        
-        # Get new values (use existing if not provided)
-        new_name = arguments.get("new_name", existing_tag.name)
-        new_category = arguments.get("category", existing_tag.category)
-        new_color = arguments.get("color", existing_tag.color)
-        
-        # Check if new name conflicts with existing tag (if name is changing)
-        if new_name != current_name:
-            name_conflict = self.db.get_tag_by_name(new_name)
-            if name_conflict:
-                return {"error": f"Tag '{new_name}' already exists"}
-        
+        # One UPDATE keeps the tag's id, so its prompt associations survive a rename
         try:
-            # Delete old tag and create new one (since there's no update method)
-            self.db.delete_tag(current_name)
-            updated_tag = self.db.create_tag(
-                name=new_name,
-                category=new_category,
-                color=new_color
+            updated_tag = await self._db_call(
+                self.db.update_tag,
+                current_name,
+                new_name=arguments.get("new_name"),
+                category=arguments.get("category"),
+                color=arguments.get("color")
             )
-            
-            return {
-                "success": True,
-                "tag": {
-                    "id": updated_tag.id,
-                    "name": updated_tag.name,
-                    "category": updated_tag.category,
-                    "color": updated_tag.color
-                },
-                "old_name": current_name,
-                "message": f"Updated tag '{current_name}' to '{new_name}'" if new_name != current_name else f"Updated tag '{current_name}'"
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to update tag: {str(e)}"}
+        except ValueError as e:
+            return {"error": str(e)}
+        
+        if not updated_tag:
+            return {"error": f"Tag '{current_name}' not found"}
+        
+        new_name = updated_tag.name
+        return {
+            "success": True,
+            "tag": {
+                "id": updated_tag.id,
+                "name": updated_tag.name,
+                "category": updated_tag.category,
+                "color": updated_tag.color
+            },
+            "old_name": current_name,
+            "message": f"Updated tag '{current_name}' to '{new_name}'" if new_name != current_name else f"Updated tag '{current_name}'"
+        }
     
     async def _delete_tag_tool(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Delete tag tool implementation."""
@@ -976,12 +1081,12 @@ class MCPStdioServer:
             raise ValueError("name is required")
         
         # Check if tag exists
-        existing_tag = self.db.get_tag_by_name(name)
+        existing_tag = await self._db_call(self.db.get_tag_by_name, name)
         if not existing_tag:
             return {"error": f"Tag '{name}' not found"}
         
         # Delete the tag
-        success = self.db.delete_tag(name)
+        success = await self._db_call(self.db.delete_tag, name)
         
         if success:
             return {
@@ -994,36 +1099,54 @@ class MCPStdioServer:
     
     def _format_prompt_content(self, prompt) -> str:
         """Format prompt content with metadata for display."""
-        lines = [f"# {prompt.title}", ""]
+        # Each optional section is followed by a blank line
+        description_section = f"**Description:** {prompt.description}\n\n" if prompt.description else ""
+        folder_section = f"**Folder:** {prompt.folder_path}\n\n" if prompt.folder_path else ""
+        tags_section = f"**Tags:** {', '.join(prompt.tag_names)}\n\n" if prompt.tag_names else ""
         
-        if prompt.description:
-            lines.extend([f"**Description:** {prompt.description}", ""])
-        
-        if prompt.folder_path:
-            lines.extend([f"**Folder:** {prompt.folder_path}", ""])
-        
-        if prompt.tags:
-            tag_names = [tag.name for tag in prompt.tags]
-            lines.extend([f"**Tags:** {', '.join(tag_names)}", ""])
-        
-        lines.extend(["---", "", prompt.content])
-        
-        return "\n".join(lines)
+        return f"# {prompt.title}\n\n{description_section}{folder_section}{tags_section}---\n\n{prompt.content}"
+    
+    # Dispatch tables, looked up by name instead of walking an if/elif chain
+    _METHOD_DISPATCH = {
+        "initialize": handle_initialize,
+        "resources/list": handle_resources_list,
+        "resources/read": handle_resources_read,
+        "tools/list": handle_tools_list,
+        "tools/call": handle_tools_call,
+        "notifications/cancelled": handle_notification,
+        "notifications/initialized": handle_notification,
+    }
+    
+    _TOOL_DISPATCH = {
+        "search_prompts": _search_prompts_tool,
+        "create_prompt": _create_prompt_tool,
+        "get_prompt": _get_prompt_tool,
+        "use_prompt_template": _use_prompt_template_tool,
+        "find_and_use_prompt": _find_and_use_prompt_tool,
+        "update_prompt": _update_prompt_tool,
+        "delete_prompt": _delete_prompt_tool,
+        "get_folders": _get_folders_tool,
+        "create_folder": _create_folder_tool,
+        "delete_folder": _delete_folder_tool,
+        "update_folder": _update_folder_tool,
+        "get_tags": _get_tags_tool,
+        "create_tag": _create_tag_tool,
+        "update_tag": _update_tag_tool,
+        "delete_tag": _delete_tag_tool,
+    }
 
 
 def main():
     """Main entry point for stdio MCP server."""
-    import sys
-    from pathlib import Path
-    
     # Default database path
     data_dir = Path.home() / ".prompt_bookmarks"
-    data_dir.mkdir(exist_ok=True)
+    if not data_dir.is_dir():
+        data_dir.mkdir(parents=True, exist_ok=True)
     db_path = str(data_dir / "prompts.db")
     
     # Create and run server
     server = MCPStdioServer(db_path)
-    asyncio.run(server.run())
+    server.run_blocking()
 
 
 if __name__ == "__main__":
@@ -4,9 +4,10 @@ Data models for Prompt Bookmarks.
 Defines the core data structures for prompts, folders, and tags.
 """
 
+import re
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -18,7 +19,7 @@ prompt_tags = Table(
     'prompt_tags',
     Base.metadata,
     Column('prompt_id', Integer, ForeignKey('prompts.id'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True, index=True)  # The primary key only covers lookups by prompt
 )
 
 
@@ -27,10 +28,10 @@ class PromptDB(Base):
     __tablename__ = 'prompts'
     
     id = Column(Integer, primary_key=True)
-    title = Column(String(200), nullable=False)
+    title = Column(String(200), nullable=False, index=True)
     content = Column(Text, nullable=False)
     description = Column(Text)
-    folder_id = Column(Integer, ForeignKey('folders.id'))
+    folder_id = Column(Integer, ForeignKey('folders.id'), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -46,7 +47,7 @@ class FolderDB(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     path = Column(String(500), nullable=False, unique=True)  # Full path like "AI/Coding/Python"
-    parent_id = Column(Integer, ForeignKey('folders.id'))
+    parent_id = Column(Integer, ForeignKey('folders.id'), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -69,17 +70,30 @@ class TagDB(Base):
     prompts = relationship("PromptDB", secondary=prompt_tags, back_populates="tags")
 
 
+# Tag colors are #RRGGBB hex codes
+_HEX_COLOR_RE = re.compile(r'#[0-9A-Fa-f]{6}')
+
+
+def validate_hex_color(value: Optional[str]) -> Optional[str]:
+    """Return a tag color unchanged, raising ValueError unless it is None or a #RRGGBB code."""
+    if value is not None and not _HEX_COLOR_RE.fullmatch(value):
+        raise ValueError(f"Invalid color '{value}', expected a hex code like '#FF5733'")
+    return value
+
+
 # Pydantic models for API and validation
 class Tag(BaseModel):
     """Pydantic model for tags."""
     id: Optional[int] = None
     name: str = Field(..., min_length=1, max_length=50)
     category: Optional[str] = Field(None, max_length=50)
-    color: Optional[str] = Field(None, pattern=r'^#[0-9A-Fa-f]{6}$')
+    color: Optional[str] = None
     created_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+    
+    _check_color = field_validator('color')(validate_hex_color)
 
 
 class Folder(BaseModel):
@@ -107,9 +121,15 @@ class Prompt(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     tags: List[Tag] = []
+    tags_csv: Optional[str] = None  # Comma-separated tag names for display
     
     class Config:
         from_attributes = True
+    
+    @property
+    def tag_names(self) -> List[str]:
+        """Names of the prompt's tags, in order."""
+        return [tag.name for tag in self.tags]
 
 
 class PromptCreate(BaseModel):
@@ -134,6 +154,7 @@ class PromptSearch(BaseModel):
     """Model for search parameters."""
     query: Optional[str] = None
     folder_path: Optional[str] = None
+    folder_path_prefix: Optional[str] = None  # Folder whose whole subtree is searched
     tags: Optional[List[str]] = None
     limit: int = Field(100, ge=1, le=1000)
     offset: int = Field(0, ge=0)
@@ -149,10 +170,16 @@ class MCPPromptResource(BaseModel):
     @classmethod
     def from_prompt(cls, prompt: Prompt) -> 'MCPPromptResource':
         """Create MCP resource from prompt."""
+        if prompt.description:
+            description = prompt.description
+        elif len(prompt.content) > 100:
+            description = prompt.content[:100] + "..."
+        else:
+            description = prompt.content
         return cls(
             uri=f"prompt:///{prompt.id}",
             name=prompt.title,
-            description=prompt.description or prompt.content[:100] + "..." if len(prompt.content) > 100 else prompt.content,
+            description=description,
             mime_type="text/plain"
         )
 